@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -23,23 +24,21 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-l*@g0it9v^dcg01@6d&e&q(p1+1)7^zkbyiu$dz*arl+9nkij8'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get('DJANGO_DEBUG', 'True') == 'True'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
 
 USE_I18N = True
 USE_L10N = True
 
-STATIC_URL = '/static/'
-STATICFILES_DIRS = [
-    BASE_DIR / 'static',
-]
-STATIC_ROOT = 'staticFiles'
 # Application definition
 
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Skips admin autodiscovery at startup; urls.py and the admin checks run it,
+    # so workers and commands that skip the URL and admin checks never import
+    # the admin modules (and with them leaflet.admin and import_export.admin).
+    'properties.apps.LazyAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -54,6 +53,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -68,8 +68,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory instead of being re-parsed per render.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -84,6 +90,21 @@ TEMPLATES = [
 WSGI_APPLICATION = 'inventoryManagement.wsgi.application'
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Holds template fragments (header, footer, localized accommodation blocks),
+# currency rates and formatted prices. LocMemCache is per process, so nothing
+# here relies on cross-process deletes: entries that can go stale carry a
+# version in their key (see accommodation_detail.html and properties/currency.py).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'inventory-management',
+    }
+}
+
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
@@ -131,10 +152,58 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
-STATIC_URL = 'static/'
+STATIC_URL = '/static/'
+STATICFILES_DIRS = [
+    BASE_DIR / 'static',
+]
+STATIC_ROOT = BASE_DIR / 'staticFiles'
+
+# Outside DEBUG, collectstatic writes content-hashed copies plus .gz/.br
+# variants, and WhiteNoise serves them with far-future immutable headers.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+WHITENOISE_MAX_AGE = 0 if DEBUG else 60 * 60 * 24
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 LOGOUT_REDIRECT_URL = '/'
 
 
+# Currency conversion
+# Rates are units per USD, loaded with `manage.py load_currency_rates`.
+
+CURRENCY_RATES_FILE = BASE_DIR / 'currency_rates.csv'
+CURRENCY_CACHE_TIMEOUT = 60 * 60
+# How long a process may keep serving rates after `load_currency_rates` ran elsewhere.
+CURRENCY_VERSION_TIMEOUT = 60
+
+
+# Change feed
+# Changes younger than this are held back so late-committing transactions
+# cannot land behind a cursor that was already handed out. Writers stamp
+# updated_at at write time (clock_timestamp() in bulk SQL), so this must exceed
+# the longest gap between a row write and its commit.
+
+CHANGEFEED_SETTLE_SECONDS = 5
+CHANGEFEED_MAX_BATCH = 1000
+
+
+# Startup profiling
+# Import-time budget checked by `manage.py profile_startup --budget` and the tests.
+
+STARTUP_IMPORT_BUDGET_MS = 1500
+
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
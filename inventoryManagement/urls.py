@@ -20,6 +20,10 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.i18n import i18n_patterns
 
+# INSTALLED_APPS uses LazyAdminConfig, so admin modules are only loaded here
+# (or by the admin checks), rather than on every manage.py invocation.
+admin.autodiscover()
+
 urlpatterns = [
     # Internationalization URL patterns
     path('i18n/', include('django.conf.urls.i18n')),
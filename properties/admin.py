@@ -1,12 +1,56 @@
-from django.contrib import admin
+from decimal import Decimal, InvalidOperation
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Max
+from django.http import HttpResponseRedirect
+from django.utils import timezone
 from leaflet.admin import LeafletGeoAdmin
-from .models import Location, Accommodation, LocalizeAccommodation
-from .forms import AccommodationAdminForm, LocationResource
+from .models import (
+    PROPERTY_OWNERS_GROUP, ConcurrentUpdateError, Location, Accommodation, LocalizeAccommodation, LocationStats,
+)
+from .forms import AccommodationAdminForm, LocalizeAccommodationAdminForm, VersionedModelForm
+from .admin_forms import LocationResource
+from .stats import apply_totals_change, location_totals
 from import_export.admin import ImportExportModelAdmin # Add this import
 
 
 # Register your models here.
 
+class VersionedModelAdmin(admin.ModelAdmin):
+    """
+    Saves only the fields the form changed, under the version check of VersionedModel,
+    so an edit never overwrites columns another writer updated meanwhile.
+    """
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        concrete = {field.name for field in obj._meta.concrete_fields}
+        update_fields = [name for name in form.changed_data if name in concrete]
+        if update_fields:
+            if 'updated_at' in concrete:
+                update_fields.append('updated_at')
+            obj.save(update_fields=update_fields)
+
+    def changeform_view(self, request, *args, **kwargs):
+        try:
+            return super().changeform_view(request, *args, **kwargs)
+        except ConcurrentUpdateError:
+            # Lost the race after the form's own version check; nothing was written.
+            self.message_user(request, VersionedModelForm.conflict_message, messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+
+
+class AccommodationActionForm(ActionForm):
+    price_percent = forms.DecimalField(
+        required=False, label='Price change %', max_digits=6, decimal_places=2,
+        help_text='Used by "Change price of selected accommodations", e.g. 10 or -5',
+    )
+
+
 @admin.register(Location)
 class LocationAdmin(LeafletGeoAdmin, ImportExportModelAdmin):
     list_display = ('title', 'location_type', 'city', 'country_code')
@@ -16,11 +60,14 @@ class LocationAdmin(LeafletGeoAdmin, ImportExportModelAdmin):
 
 
 @admin.register(Accommodation)
-class AccommodationAdmin(LeafletGeoAdmin, admin.ModelAdmin):
+class AccommodationAdmin(LeafletGeoAdmin, VersionedModelAdmin):
     list_display = ('title', 'feed', 'location', 'review_score', 'usd_rate', 'published')
     search_fields = ('title', 'user__username')
     list_filter = ('published', 'feed')
+    list_select_related = ('location',)
     form = AccommodationAdminForm
+    action_form = AccommodationActionForm
+    actions = ['publish', 'unpublish', 'change_price']
 
     def get_form(self, request, obj=None, **kwargs):
         """
@@ -40,9 +87,57 @@ class AccommodationAdmin(LeafletGeoAdmin, admin.ModelAdmin):
             obj.user = request.user
         super().save_model(request, obj, form, change)
 
+    def bulk_update(self, request, queryset, **values):
+        """
+        Apply `values` to every selected row in one UPDATE. Bumping the version makes
+        any form opened before the bulk edit fail its version check.
+        """
+        with transaction.atomic():
+            # Lock the selection so concurrent saves cannot slip between the
+            # before/after totals; the rollup is then moved by their difference.
+            pks = list(queryset.values_list('pk', flat=True))
+            selected = Accommodation.objects.filter(pk__in=pks)
+            list(selected.select_for_update().values_list('pk', flat=True))
+            before = location_totals(selected)
+            updated = selected.update(version=F('version') + 1, updated_at=timezone.now(), **values)
+            # queryset.update() bypasses the signals that maintain the location rollup.
+            apply_totals_change(before, location_totals(selected))
+        return updated
+
+    @admin.action(description='Publish selected accommodations', permissions=['change'])
+    def publish(self, request, queryset):
+        updated = self.bulk_update(request, queryset.filter(published=False), published=True)
+        self.message_user(request, f"{updated} accommodations published.", messages.SUCCESS)
+
+    @admin.action(description='Unpublish selected accommodations', permissions=['change'])
+    def unpublish(self, request, queryset):
+        updated = self.bulk_update(request, queryset.filter(published=True), published=False)
+        self.message_user(request, f"{updated} accommodations unpublished.", messages.SUCCESS)
+
+    @admin.action(description='Change price of selected accommodations', permissions=['change'])
+    def change_price(self, request, queryset):
+        try:
+            percent = Decimal(request.POST.get('price_percent') or '')
+        except InvalidOperation:
+            percent = None
+        if percent is None or not percent.is_finite() or percent <= -100:
+            self.message_user(request, 'Enter a price change % greater than -100.', messages.ERROR)
+            return
+        factor = 1 + percent / 100
+        field = Accommodation._meta.get_field('usd_rate')
+        limit = Decimal(10) ** (field.max_digits - field.decimal_places)
+        highest = queryset.aggregate(highest=Max('usd_rate'))['highest']
+        if highest is not None and (highest * factor).quantize(Decimal(1).scaleb(-field.decimal_places)) >= limit:
+            self.message_user(
+                request, f"A {percent}% change would exceed the largest price that can be stored.", messages.ERROR
+            )
+            return
+        updated = self.bulk_update(request, queryset, usd_rate=F('usd_rate') * factor)
+        self.message_user(request, f"Price changed by {percent}% for {updated} accommodations.", messages.SUCCESS)
+
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        if request.user.groups.filter(name='Property Owners').exists() and not request.user.is_superuser:
+        if request.user.groups.filter(name=PROPERTY_OWNERS_GROUP).exists() and not request.user.is_superuser:
             return qs.filter(user=request.user)
         return qs
 
@@ -59,7 +154,39 @@ class AccommodationAdmin(LeafletGeoAdmin, admin.ModelAdmin):
     # Optional: Add help text to clarify why the field is read-only
 
 @admin.register(LocalizeAccommodation)
-class LocalizeAccommodationAdmin(admin.ModelAdmin):
+class LocalizeAccommodationAdmin(VersionedModelAdmin):
     list_display = ('property', 'language')
     search_fields = ('property__title', 'language')
     list_filter = ('language',)
+    list_select_related = ('property',)
+    form = LocalizeAccommodationAdminForm
+
+
+@admin.register(LocationStats)
+class LocationStatsAdmin(admin.ModelAdmin):
+    list_display = ('location', 'listing_count', 'average_price', 'average_review_score', 'updated_at')
+    search_fields = ('location__title',)
+    list_select_related = ('location',)
+    readonly_fields = ('location', 'listing_count', 'price_total', 'review_total', 'updated_at')
+
+    # The table is maintained by signals and `rebuild_location_stats`, never by hand.
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.unregister(User)
+
+@admin.register(User)
+class PropertyOwnerUserAdmin(UserAdmin):
+    actions = ['approve_property_owners']
+
+    @admin.action(description='Approve selected pending property owners', permissions=['change'])
+    def approve_property_owners(self, request, queryset):
+        """
+        Activate every selected inactive property owner with a single UPDATE.
+        """
+        approved = queryset.filter(is_active=False, groups__name=PROPERTY_OWNERS_GROUP).update(is_active=True)
+        self.message_user(request, f"{approved} property owners approved.", messages.SUCCESS)
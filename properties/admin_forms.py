@@ -0,0 +1,40 @@
+# properties/admin_forms.py
+# Forms and import/export resources that depend on leaflet and import_export.
+# Kept apart from forms.py so that importing the public forms stays cheap.
+
+from django import forms
+from leaflet.forms.widgets import LeafletWidget
+from import_export import resources
+from .models import Location
+
+
+class LocationForm(forms.ModelForm):
+    class Meta:
+        model = Location
+        fields = '__all__'
+        widgets = {
+            'center': LeafletWidget(),
+        }
+
+class LocationResource(resources.ModelResource):
+    class Meta:
+        model = Location
+        fields = ('id', 'title', 'center', 'parent_id', 'location_type', 'country_code', 'state_abbr', 'city')  # Adjust fields as needed
+        import_id_fields = ('id',)  # Specify the unique identifier field
+
+    def before_import_row(self, row, **kwargs):
+        """
+        Ensure parent_id exists or create a placeholder parent.
+        """
+        parent_id = row.get('parent_id')
+        if parent_id:
+            parent, created = Location.objects.get_or_create(
+                id=parent_id,
+                defaults={
+                    'title': f"Placeholder for {parent_id}",
+                    'center': 'POINT(0 0)',  # Placeholder center, adjust if necessary
+                    'location_type': 'unknown',
+                    'country_code': 'XX',  # Default values
+                },
+            )
+            row['parent_id'] = parent.id
@@ -1,11 +1,37 @@
 # apps.py
 
 from django.apps import AppConfig
+from django.contrib.admin import apps as admin_apps
+from django.contrib.admin.checks import check_admin_app, check_dependencies
+from django.core import checks
 from django.db.models.signals import post_migrate
 
 class PropertiesConfig(AppConfig):
+    default = True
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'properties'
 
     def ready(self):
         import properties.signals  # Ensure signals are imported and connected
+
+
+def check_discovered_admin_app(app_configs, **kwargs):
+    """
+    The ModelAdmin checks, run after the admin modules are registered. urls.py
+    autodiscovers, so on its own check_admin_app could see an empty registry.
+    """
+    from django.contrib import admin
+    admin.autodiscover()
+    return check_admin_app(app_configs, **kwargs)
+
+
+class LazyAdminConfig(admin_apps.SimpleAdminConfig):
+    """
+    Admin without autodiscovery at startup (see urls.py). Only the admin-tagged
+    checks load the admin modules, so commands that skip them stay light.
+    """
+    default = False
+
+    def ready(self):
+        checks.register(check_dependencies, checks.Tags.admin)
+        checks.register(check_discovered_admin_app, checks.Tags.admin)
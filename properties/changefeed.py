@@ -0,0 +1,112 @@
+# properties/changefeed.py
+
+import base64
+import heapq
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Accommodation, Location, Tombstone
+
+# Streams merged into the feed, in the order used to break timestamp ties.
+STREAMS = {
+    'accommodation': (Accommodation, 'updated_at'),
+    'location': (Location, 'updated_at'),
+    'tombstone': (Tombstone, 'deleted_at'),
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(position):
+    timestamp, stream, key = position
+    raw = f"{timestamp.isoformat()}|{stream}|{key}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Turn a cursor handed out by `fetch_changes` back into (timestamp, stream, key).
+    An empty cursor starts from the beginning.
+    """
+    if not cursor:
+        return None
+    try:
+        timestamp, stream, key = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 2)
+        timestamp = datetime.fromisoformat(timestamp)
+        if stream == 'tombstone':
+            key = int(key)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+    if stream not in STREAMS:
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+    return timestamp, stream, key
+
+
+def _after(stream, timestamp_field, position):
+    """
+    Filter for the rows of `stream` that sort after `position` in (timestamp, stream, pk) order.
+    """
+    if position is None:
+        return Q()
+    timestamp, cursor_stream, key = position
+    if stream > cursor_stream:
+        return Q(**{f'{timestamp_field}__gte': timestamp})
+    if stream < cursor_stream:
+        return Q(**{f'{timestamp_field}__gt': timestamp})
+    return Q(**{f'{timestamp_field}__gt': timestamp}) | Q(**{timestamp_field: timestamp, 'pk__gt': key})
+
+
+def _stream(stream, position, until, limit):
+    model, timestamp_field = STREAMS[stream]
+    rows = (
+        model._base_manager.filter(_after(stream, timestamp_field, position))
+        .filter(**{f'{timestamp_field}__lte': until})
+        .order_by(timestamp_field, 'pk')
+    )
+    if stream == 'tombstone':
+        for pk, timestamp, model_name, object_id in rows.values_list('pk', timestamp_field, 'model', 'object_id')[:limit]:
+            yield (timestamp, stream, pk), {'model': model_name, 'id': object_id, 'op': 'delete'}
+    else:
+        for pk, timestamp in rows.values_list('pk', timestamp_field)[:limit]:
+            yield (timestamp, stream, pk), {'model': stream, 'id': pk, 'op': 'upsert'}
+
+
+def fetch_changes(cursor=None, limit=500):
+    """
+    Return up to `limit` changes after `cursor`, oldest first, and the cursor to
+    resume from. Changes younger than CHANGEFEED_SETTLE_SECONDS are held back so
+    a transaction that commits late cannot slip in behind a cursor already handed out.
+    """
+    position = decode_cursor(cursor)
+    until = timezone.now() - timedelta(seconds=settings.CHANGEFEED_SETTLE_SECONDS)
+    merged = heapq.merge(
+        *(_stream(stream, position, until, limit) for stream in STREAMS),
+        key=lambda change: change[0],
+    )
+    changes = []
+    last = None
+    for last, change in merged:
+        change['at'] = last[0].isoformat()
+        changes.append(change)
+        if len(changes) == limit:
+            break
+    next_cursor = encode_cursor(last) if last else cursor
+    return changes, next_cursor
+
+
+def iter_changes(cursor=None, batch_size=500):
+    """
+    Yield (batch, next_cursor) pairs until the feed is drained.
+    """
+    while True:
+        changes, cursor = fetch_changes(cursor, batch_size)
+        if not changes:
+            return
+        yield changes, cursor
+        if len(changes) < batch_size:
+            return
@@ -2,5 +2,8 @@
 
 import datetime
 
+from django.utils.functional import SimpleLazyObject
+
 def current_year(request):
-    return {'current_year': datetime.datetime.now().year}
+    # Only evaluated when a template reads it, i.e. when the cached footer is rebuilt.
+    return {'current_year': SimpleLazyObject(lambda: datetime.datetime.now().year)}
@@ -0,0 +1,134 @@
+# properties/currency.py
+
+import csv
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Max, Value
+from django.utils.formats import number_format
+from django.utils.translation import get_language
+
+from .models import CurrencyRate
+
+DEFAULT_CURRENCY = 'USD'
+RATES_CACHE_KEY = 'currency:rates'
+RATES_VERSION_KEY = 'currency:rates-version'
+CENT = Decimal('0.01')
+
+
+def rates_version():
+    """
+    When the rates table was last loaded. Each process caches it only for
+    CURRENCY_VERSION_TIMEOUT, so a load in another process (the management
+    command, another worker) reaches every cache within that window.
+    """
+    def latest():
+        loaded_at = CurrencyRate.objects.aggregate(loaded_at=Max('updated_at'))['loaded_at']
+        return loaded_at.isoformat() if loaded_at else 'empty'
+    return cache.get_or_set(RATES_VERSION_KEY, latest, settings.CURRENCY_VERSION_TIMEOUT)
+
+
+def get_rates():
+    """
+    Mapping of currency code to units per USD, cached so list and detail views
+    do not query the rates table. Keyed on `rates_version()`, so a reload is
+    picked up without waiting for CURRENCY_CACHE_TIMEOUT.
+    """
+    return cache.get_or_set(
+        f'{RATES_CACHE_KEY}:{rates_version()}',
+        lambda: dict(CurrencyRate.objects.values_list('code', 'rate')),
+        settings.CURRENCY_CACHE_TIMEOUT,
+    )
+
+
+def get_rate(currency):
+    if currency == DEFAULT_CURRENCY:
+        return Decimal(1)
+    return get_rates().get(currency)
+
+
+def normalize_currency(currency):
+    """
+    Upper-case a currency code, falling back to USD for unknown codes.
+    """
+    currency = (currency or '').upper()
+    return currency if currency and get_rate(currency) is not None else DEFAULT_CURRENCY
+
+
+def request_currency(request):
+    """
+    The visitor's currency: `?currency=` when given (remembered in the session),
+    otherwise the session value, otherwise USD.
+    """
+    requested = request.GET.get('currency')
+    if requested:
+        currency = normalize_currency(requested)
+        request.session['currency'] = currency
+        return currency
+    return normalize_currency(request.session.get('currency'))
+
+
+def load_rates(path):
+    """
+    Replace the rates table with the `code,rate` rows of a CSV file.
+    Returns the number of rates loaded.
+    """
+    with open(path, newline='', encoding='utf-8') as file:
+        rates = [
+            CurrencyRate(code=row['code'].strip().upper(), rate=Decimal(row['rate']))
+            for row in csv.DictReader(file)
+        ]
+    with transaction.atomic():
+        CurrencyRate.objects.all().delete()
+        CurrencyRate.objects.bulk_create(rates)
+    cache.delete(RATES_VERSION_KEY)
+    return len(rates)
+
+
+def annotate_price(queryset, currency):
+    """
+    Add a `price` annotation in `currency`, computed by the database.
+    """
+    rate = get_rate(currency) or Decimal(1)
+    return queryset.annotate(
+        price=ExpressionWrapper(
+            F('usd_rate') * Value(rate),
+            output_field=DecimalField(max_digits=28, decimal_places=2),
+        )
+    )
+
+
+def filter_price_range(queryset, currency, minimum=None, maximum=None):
+    """
+    Filter on a price range given in `currency`. The bounds are converted to USD
+    so the comparison stays on the indexed `usd_rate` column.
+    """
+    rate = get_rate(currency) or Decimal(1)
+    if minimum is not None:
+        queryset = queryset.filter(usd_rate__gte=Decimal(minimum) / rate)
+    if maximum is not None:
+        queryset = queryset.filter(usd_rate__lte=Decimal(maximum) / rate)
+    return queryset
+
+
+def convert(usd_amount, currency):
+    rate = get_rate(currency) or Decimal(1)
+    return (Decimal(usd_amount) * rate).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def format_price(accommodation, currency):
+    """
+    Localized price string for an accommodation, cached per (accommodation,
+    currency, language). The USD rate and the rates version are part of the
+    key, so neither a price edit nor a rates reload serves a stale string.
+    """
+    version = rates_version() if currency != DEFAULT_CURRENCY else ''
+    key = f'price:{accommodation.pk}:{currency}:{get_language()}:{accommodation.usd_rate}:{version}'
+    formatted = cache.get(key)
+    if formatted is None:
+        amount = number_format(convert(accommodation.usd_rate, currency), 2, force_grouping=True)
+        formatted = f'{amount} {currency}'
+        cache.set(key, formatted, settings.CURRENCY_CACHE_TIMEOUT)
+    return formatted
@@ -0,0 +1,51 @@
+# properties/exports.py
+
+import csv
+import io
+import json
+
+from .models import Accommodation
+
+EXPORT_FIELDS = (
+    'id', 'feed', 'title', 'country_code', 'location_id', 'bedroom_count',
+    'review_score', 'usd_rate', 'published', 'updated_at',
+)
+COLUMNS = EXPORT_FIELDS + ('longitude', 'latitude')
+
+
+def export_rows(country_code):
+    """
+    Accommodations of one country as plain values, in primary-key order.
+    """
+    queryset = (
+        Accommodation.objects.filter(country_code=country_code)
+        .order_by('pk')
+        .only(*EXPORT_FIELDS, 'center')
+    )
+    for accommodation in queryset.iterator(chunk_size=2000):
+        row = [getattr(accommodation, field) for field in EXPORT_FIELDS]
+        yield row + [accommodation.center.x, accommodation.center.y]
+
+
+def csv_header():
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(COLUMNS)
+    return buffer.getvalue().encode('utf-8')
+
+
+def write_csv_shard(country_code, shard_path):
+    with open(shard_path, mode='w', encoding='utf-8', newline='') as shard:
+        writer = csv.writer(shard)
+        for row in export_rows(country_code):
+            writer.writerow(row)
+
+
+def write_ndjson_shard(country_code, shard_path):
+    with open(shard_path, mode='w', encoding='utf-8') as shard:
+        for row in export_rows(country_code):
+            record = dict(zip(COLUMNS, row))
+            record['review_score'] = str(record['review_score'])
+            record['usd_rate'] = str(record['usd_rate'])
+            record['updated_at'] = record['updated_at'].isoformat()
+            shard.write(json.dumps(record, ensure_ascii=False))
+            shard.write('\n')
@@ -1,8 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
-from leaflet.forms.widgets import LeafletWidget
-from .models import Location, Accommodation
-from import_export import resources
+from .models import Accommodation, LocalizeAccommodation
+from .geocoding import locate
 
 
 class SignUpForm(forms.ModelForm):
@@ -11,15 +10,34 @@ class SignUpForm(forms.ModelForm):
         model = User
         fields = ['username', 'email', 'password']
 
-class LocationForm(forms.ModelForm):
-    class Meta:
-        model = Location
-        fields = '__all__'
-        widgets = {
-            'center': LeafletWidget(),
-        }
+class VersionedModelForm(forms.ModelForm):
+    """
+    Carries the loaded `version` in a hidden field and rejects the submit when
+    the row has been saved by someone else in the meantime.
+    """
+    conflict_message = (
+        'This record was changed by someone else after you opened it. '
+        'Reload the page and apply your edits again.'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'version' in self.fields:
+            self.fields['version'].widget = forms.HiddenInput()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        version = cleaned_data.get('version')
+        if self.instance.pk and version is not None:
+            current = (
+                type(self.instance)._base_manager.filter(pk=self.instance.pk)
+                .values_list('version', flat=True).first()
+            )
+            if current is not None and current != version:
+                raise forms.ValidationError(self.conflict_message, code='conflict')
+        return cleaned_data
 
-class AccommodationAdminForm(forms.ModelForm):
+class AccommodationAdminForm(VersionedModelForm):
     class Meta:
         model = Accommodation
         fields = '__all__'    
@@ -28,26 +46,30 @@ class AccommodationAdminForm(forms.ModelForm):
         if self.instance and self.instance.pk:  # If editing an existing object
             self.fields['user'].widget.attrs['readonly'] = True
             self.fields['user'].widget.attrs['style'] = 'pointer-events: none; background-color: #e9ecef;'
+        self.fields['location'].required = False
+        self.fields['location'].help_text = 'Leave empty to assign the city containing or nearest to the center.'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        center = cleaned_data.get('center')
+        if not cleaned_data.get('location') and center:
+            location = locate(center)
+            if location is None:
+                self.add_error('location', 'No city found near this center; choose a location.')
+            else:
+                cleaned_data['location'] = location
+        return cleaned_data
 
-class LocationResource(resources.ModelResource):
+class LocalizeAccommodationAdminForm(VersionedModelForm):
     class Meta:
-        model = Location
-        fields = ('id', 'title', 'center', 'parent_id', 'location_type', 'country_code', 'state_abbr', 'city')  # Adjust fields as needed
-        import_id_fields = ('id',)  # Specify the unique identifier field
-
-    def before_import_row(self, row, **kwargs):
-        """
-        Ensure parent_id exists or create a placeholder parent.
-        """
-        parent_id = row.get('parent_id')
-        if parent_id:
-            parent, created = Location.objects.get_or_create(
-                id=parent_id,
-                defaults={
-                    'title': f"Placeholder for {parent_id}",
-                    'center': 'POINT(0 0)',  # Placeholder center, adjust if necessary
-                    'location_type': 'unknown',
-                    'country_code': 'XX',  # Default values
-                },
-            )
-            row['parent_id'] = parent.id
+        model = LocalizeAccommodation
+        fields = '__all__'
+
+
+def __getattr__(name):
+    # LocationForm and LocationResource need leaflet and import_export, which the
+    # public views and management commands never use; load them on first access.
+    if name in ('LocationForm', 'LocationResource'):
+        from . import admin_forms
+        return getattr(admin_forms, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
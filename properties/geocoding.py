@@ -0,0 +1,136 @@
+# properties/geocoding.py
+
+from django.contrib.gis.db.models import PointField
+from django.db import connection, transaction
+from django.db.models import FloatField, Func, Value
+
+from .models import Accommodation, Location
+
+CITY = 'city'
+
+
+class KNNDistance(Func):
+    """
+    PostGIS `<->` distance. Ordering by it lets the planner walk the GiST index
+    on the geometry column instead of computing ST_Distance for every row.
+    """
+    arg_joiner = ' <-> '
+    template = '(%(expressions)s)'
+    output_field = FloatField()
+
+
+def _point_value(point):
+    """
+    The point as a query value in the SRID of `Location.center`, so `<->` never
+    compares mixed SRIDs. A point without an SRID is taken to be WGS84.
+    """
+    srid = Location._meta.get_field('center').srid
+    point = point.clone()
+    if point.srid is None:
+        point.srid = 4326
+    if point.srid != srid:
+        point.transform(srid)
+    return Value(point, output_field=PointField(srid=srid))
+
+
+def containing_city(point):
+    """
+    City whose boundary contains the point, or None when no boundary matches.
+    """
+    return (
+        Location.objects.filter(location_type=CITY, boundary__contains=point)
+        .order_by('pk')
+        .first()
+    )
+
+
+def nearest_city(point):
+    """
+    City with the nearest center, found with an index-assisted KNN query.
+    """
+    return (
+        Location.objects.filter(location_type=CITY)
+        .order_by(KNNDistance('center', _point_value(point)))
+        .first()
+    )
+
+
+def locate(point):
+    """
+    Resolve the Location an accommodation at `point` belongs to: the containing
+    city when boundaries are loaded, otherwise the nearest city center.
+    """
+    return containing_city(point) or nearest_city(point)
+
+
+REASSIGN_SQL = """
+    WITH matched AS (
+        SELECT acc.id, COALESCE(
+            (SELECT loc.id FROM {location} loc
+             WHERE loc.location_type = %s AND loc.boundary IS NOT NULL
+               AND ST_Contains(loc.boundary, acc.center)
+             ORDER BY loc.id LIMIT 1),
+            (SELECT loc.id FROM {location} loc
+             WHERE loc.location_type = %s
+             ORDER BY loc.center <-> acc.center LIMIT 1)
+        ) AS location_id
+        FROM {accommodation} acc
+        WHERE acc.id = ANY(%s)
+    )
+    {action}
+"""
+
+# clock_timestamp(), not NOW(): NOW() is the transaction start, and a chunk of
+# containment/KNN lookups can outlast CHANGEFEED_SETTLE_SECONDS, which would
+# commit rows behind change-feed cursors already handed out.
+REASSIGN_UPDATE = """
+    UPDATE {accommodation} AS target
+    SET location_id = matched.location_id, updated_at = clock_timestamp()
+    FROM matched
+    WHERE target.id = matched.id
+      AND matched.location_id IS NOT NULL
+      AND target.location_id IS DISTINCT FROM matched.location_id
+"""
+
+REASSIGN_COUNT = """
+    SELECT COUNT(*) FROM matched
+    JOIN {accommodation} AS target ON target.id = matched.id
+    WHERE matched.location_id IS NOT NULL
+      AND target.location_id IS DISTINCT FROM matched.location_id
+"""
+
+
+def reassign_chunk(ids, dry_run=False):
+    """
+    Reassign the location of the given accommodations in a single statement,
+    letting PostGIS run the containment and KNN checks for the whole chunk.
+    Returns the number of rows that changed (or would change).
+    """
+    tables = {
+        'location': connection.ops.quote_name(Location._meta.db_table),
+        'accommodation': connection.ops.quote_name(Accommodation._meta.db_table),
+    }
+    action = (REASSIGN_COUNT if dry_run else REASSIGN_UPDATE).format(**tables)
+    sql = REASSIGN_SQL.format(action=action, **tables)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [CITY, CITY, list(ids)])
+        return cursor.fetchone()[0] if dry_run else cursor.rowcount
+
+
+def reassign_locations(queryset=None, chunk_size=5000, dry_run=False):
+    """
+    Walk `queryset` (all accommodations by default) in primary-key order and
+    reassign locations chunk by chunk. Yields the running total after each chunk.
+    """
+    queryset = (queryset if queryset is not None else Accommodation.objects.all()).order_by('pk')
+    last_id = None
+    total = 0
+    while True:
+        chunk = queryset if last_id is None else queryset.filter(pk__gt=last_id)
+        ids = list(chunk.values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return
+        with transaction.atomic():
+            total += reassign_chunk(ids, dry_run=dry_run)
+        last_id = ids[-1]
+        yield total
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from properties.geocoding import reassign_locations
+from properties.models import Accommodation
+from properties.stats import rebuild_location_stats
+
+class Command(BaseCommand):
+    help = 'Reassign Accommodation.location from each accommodation center (containing or nearest city)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Accommodations per UPDATE statement')
+        parser.add_argument('--feed', type=int, help='Only reassign accommodations from this feed')
+        parser.add_argument('--dry-run', action='store_true', help='Count the rows that would change without writing')
+
+    def handle(self, *args, **kwargs):
+        queryset = Accommodation.objects.all()
+        if kwargs['feed'] is not None:
+            queryset = queryset.filter(feed=kwargs['feed'])
+
+        changed = 0
+        try:
+            for changed in reassign_locations(queryset, chunk_size=kwargs['chunk_size'], dry_run=kwargs['dry_run']):
+                self.stdout.write(f"{changed} accommodations reassigned so far")
+            if changed and not kwargs['dry_run']:
+                # The bulk UPDATE bypasses the signals that keep the rollup current.
+                rebuild_location_stats()
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error assigning locations: {e}"))
+            return
+
+        verb = "would be" if kwargs['dry_run'] else "were"
+        self.stdout.write(self.style.SUCCESS(f"{changed} accommodations {verb} reassigned"))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from properties.models import Accommodation, LocalizeAccommodation
+
+class Command(BaseCommand):
+    help = 'Compare list-query throughput with the JSON payload columns loaded and deferred'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Times each query is evaluated')
+        parser.add_argument('--limit', type=int, default=1000, help='Rows fetched per query')
+
+    def measure(self, label, queryset, iterations):
+        rows = 0
+        start = time.perf_counter()
+        for _ in range(iterations):
+            rows += len(list(queryset.all()))
+        elapsed = time.perf_counter() - start
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(f"{label:<36} {rows:>8} rows  {elapsed * 1000:10.1f} ms  {rate:12.0f} rows/s")
+
+    def handle(self, *args, **kwargs):
+        iterations, limit = kwargs['iterations'], kwargs['limit']
+        for model in (Accommodation, LocalizeAccommodation):
+            name = model.__name__
+            before = model.objects.with_payload().order_by('pk')[:limit]
+            after = model.objects.order_by('pk')[:limit]
+            self.measure(f"{name} (payload loaded)", before, iterations)
+            self.measure(f"{name} (payload deferred)", after, iterations)
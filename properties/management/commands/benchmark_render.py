@@ -0,0 +1,50 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from properties import views
+from properties.models import Accommodation
+
+class Command(BaseCommand):
+    help = 'Measure render time of the home and accommodation_detail pages, cold and with warm caches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='Warm renders per page')
+        parser.add_argument('--accommodation', help='Accommodation id for accommodation_detail (default: first)')
+
+    def make_request(self, path):
+        request = RequestFactory().get(path)
+        request.user = AnonymousUser()
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+        return request
+
+    def measure(self, label, path, view, iterations, *args):
+        cache.clear()
+        start = time.perf_counter()
+        view(self.make_request(path), *args)
+        cold = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            view(self.make_request(path), *args)
+        warm = (time.perf_counter() - start) * 1000 / iterations
+        self.stdout.write(f"{label:<24} cold {cold:8.2f} ms   warm {warm:8.3f} ms/render")
+
+    def handle(self, *args, **kwargs):
+        iterations = kwargs['iterations']
+        self.measure('home', '/', views.home, iterations)
+
+        accommodation_id = kwargs['accommodation'] or (
+            Accommodation.objects.order_by('pk').values_list('pk', flat=True).first()
+        )
+        if accommodation_id is None:
+            self.stdout.write(self.style.WARNING("No accommodations found; skipping accommodation_detail."))
+            return
+        self.measure(
+            'accommodation_detail', f'/accommodation/{accommodation_id}/',
+            views.accommodation_detail, iterations, accommodation_id,
+        )
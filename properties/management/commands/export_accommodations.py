@@ -0,0 +1,38 @@
+import os
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from properties.exports import csv_header, write_csv_shard, write_ndjson_shard
+from properties.models import Accommodation
+from properties.parallel import merge_shards, run_sharded
+from properties.startup import CHECKS_WITHOUT_URLCONF
+
+class Command(BaseCommand):
+    help = 'Export accommodations as CSV or NDJSON, optionally split by country across worker processes'
+    requires_system_checks = CHECKS_WITHOUT_URLCONF
+    OUTPUT_DIR = "Generated"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+        parser.add_argument('--workers', type=int, default=1, help='Export countries in this many processes')
+        parser.add_argument('--output', help=f'Output file (default: {self.OUTPUT_DIR}/accommodations.<format>)')
+
+    def handle(self, *args, **kwargs):
+        export_format = kwargs['format']
+        output = kwargs['output'] or os.path.join(self.OUTPUT_DIR, f'accommodations.{export_format}')
+        try:
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+            sizes = dict(
+                Accommodation.objects.values_list('country_code').annotate(size=Count('pk')).order_by()
+            )
+            shard_paths = run_sharded(
+                write_csv_shard if export_format == 'csv' else write_ndjson_shard,
+                sorted(sizes),
+                workers=kwargs['workers'],
+                priority=sizes.get,
+            )
+            with open(output, 'wb') as file:
+                merge_shards(shard_paths, file, header=csv_header() if export_format == 'csv' else None)
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error exporting accommodations: {e}"))
+            return
+        self.stdout.write(self.style.SUCCESS(f"{sum(sizes.values())} accommodations exported to {output}"))
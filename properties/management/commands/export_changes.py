@@ -0,0 +1,39 @@
+import json
+import os
+from django.core.management.base import BaseCommand
+from properties.changefeed import InvalidCursor, iter_changes
+from properties.startup import CHECKS_WITHOUT_URLCONF
+
+class Command(BaseCommand):
+    help = 'Stream Location/Accommodation changes after a cursor as NDJSON, in order and in batches'
+    requires_system_checks = CHECKS_WITHOUT_URLCONF
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Cursor returned by a previous run (default: from the beginning)')
+        parser.add_argument(
+            '--cursor-file',
+            help='Read the starting cursor from this file and store the final cursor back into it',
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help='Changes fetched per query')
+
+    def handle(self, *args, **kwargs):
+        cursor = kwargs['since']
+        cursor_file = kwargs['cursor_file']
+        if cursor is None and cursor_file and os.path.exists(cursor_file):
+            with open(cursor_file, encoding='utf-8') as file:
+                cursor = file.read().strip() or None
+
+        count = 0
+        try:
+            for batch, cursor in iter_changes(cursor, kwargs['batch_size']):
+                for change in batch:
+                    self.stdout.write(json.dumps(change))
+                count += len(batch)
+        except InvalidCursor as e:
+            self.stderr.write(self.style.ERROR(f"Error exporting changes: {e}"))
+            return
+
+        if cursor_file and cursor:
+            with open(cursor_file, mode='w', encoding='utf-8') as file:
+                file.write(cursor)
+        self.stderr.write(f"{count} changes exported; next cursor: {cursor or ''}")
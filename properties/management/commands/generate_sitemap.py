@@ -1,52 +1,78 @@
 import json
 import os
 from django.core.management.base import BaseCommand
+from django.db.models import Count
 from properties.models import Location
+from properties.parallel import remove_shards, run_sharded
+from properties.sitemap import build_country_entry, write_country_shard
+from properties.startup import CHECKS_WITHOUT_URLCONF
 
 class Command(BaseCommand):
     help = 'Generate a dynamic sitemap.json file with hierarchical locations'
     OUTPUT_DIR = "Generated"
+    # The URL checks import the URLconf and, through it, the whole admin stack;
+    # a cron job that only reads locations runs every other check.
+    requires_system_checks = CHECKS_WITHOUT_URLCONF
 
-    def create_location_entry(self, location, base_path=''):
-        slug = location.title.lower().replace(' ', '-')
-        full_path = f"{base_path}/{slug}" if base_path else slug
-        entry = {location.title: full_path}
-        child_locations = Location.objects.filter(parent_id=location).order_by('title')
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--with-stats', action='store_true',
+            help='Include listing count, average price and review score from the location stats table',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Build country subtrees in this many processes (output is identical to --workers 1)',
+        )
+        parser.add_argument('--output-dir', default=None, help=f'Directory for sitemap.json (default: {self.OUTPUT_DIR})')
 
-        if child_locations.exists():
-            entry['locations'] = []
-            for child in child_locations:
-                child_entry = self.create_location_entry(child, base_path=full_path)
-                entry['locations'].append(child_entry)
-
-        return entry
+    def build_parallel(self, countries, with_stats, workers):
+        # Schedule the countries with the most locations first so one large
+        # subtree does not end up running alone at the tail.
+        sizes = dict(
+            Location.objects.values_list('country_code').annotate(size=Count('pk')).order_by()
+        )
+        codes = {country.pk: country.country_code for country in countries}
+        shard_paths = run_sharded(
+            write_country_shard,
+            [(country.pk, with_stats) for country in countries],
+            workers=workers,
+            priority=lambda task: sizes.get(codes[task[0]], 0),
+        )
+        try:
+            sitemap = []
+            for path in shard_paths:
+                with open(path, encoding='utf-8') as shard:
+                    sitemap.append(json.load(shard))
+            return sitemap
+        finally:
+            remove_shards(shard_paths)
 
     def handle(self, *args, **kwargs):
+        output_dir = kwargs.get('output_dir') or self.OUTPUT_DIR
+        with_stats = kwargs.get('with_stats', False)
+        workers = kwargs.get('workers') or 1
         # Always attempt to create the directory, triggering the mock exception if any
         try:
-            os.makedirs(self.OUTPUT_DIR, exist_ok=True)
+            os.makedirs(output_dir, exist_ok=True)
         except Exception as e:
             self.stderr.write(self.style.ERROR(f"Error generating sitemap: {e}"))
             return
 
-        sitemap_file = os.path.join(self.OUTPUT_DIR, 'sitemap.json')
+        sitemap_file = os.path.join(output_dir, 'sitemap.json')
 
         try:
-            countries = Location.objects.filter(location_type='country').order_by('title')
-            if not countries.exists():
+            countries = list(
+                Location.objects.filter(location_type='country').order_by('title')
+                .only('pk', 'title', 'country_code')
+            )
+            if not countries:
                 self.stdout.write(self.style.WARNING("No countries found in the database."))
                 return
 
-            sitemap = []
-            for country in countries:
-                slug = country.title.lower().replace(' ', '-')
-                # Ensure 'locations': [] is always present
-                country_entry = {country.title: slug, 'locations': []}
-                child_locations = Location.objects.filter(parent_id=country).order_by('title')
-                for child in child_locations:
-                    child_entry = self.create_location_entry(child, base_path=slug)
-                    country_entry['locations'].append(child_entry)
-                sitemap.append(country_entry)
+            if workers > 1:
+                sitemap = self.build_parallel(countries, with_stats, workers)
+            else:
+                sitemap = [build_country_entry(country, with_stats) for country in countries]
 
             with open(sitemap_file, mode="w", encoding='utf-8') as file:
                 json.dump(sitemap, file, indent=4, ensure_ascii=False)
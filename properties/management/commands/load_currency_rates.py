@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from properties.currency import load_rates
+
+class Command(BaseCommand):
+    help = 'Load currency conversion rates (units per USD) from a local CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='CSV file with code,rate columns (default: CURRENCY_RATES_FILE)')
+
+    def handle(self, *args, **kwargs):
+        path = kwargs['path'] or settings.CURRENCY_RATES_FILE
+        try:
+            count = load_rates(path)
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error loading currency rates: {e}"))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Loaded {count} currency rates from {path}"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from properties.payloads import normalize_payloads
+
+class Command(BaseCommand):
+    help = 'Backfill the amenity code and image manifest tables from the accommodation JSON fields'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Accommodations per batch')
+
+    def handle(self, *args, **kwargs):
+        try:
+            count = normalize_payloads(kwargs['batch_size'])
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error normalizing payloads: {e}"))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Normalized payloads of {count} accommodations"))
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from properties.startup import CHECKS_WITHOUT_URLCONF, heavy_imports, profile_imports, total_import_ms
+
+class Command(BaseCommand):
+    help = 'Report import-time cost of starting Django and loading a management command'
+    requires_system_checks = CHECKS_WITHOUT_URLCONF
+
+    def add_arguments(self, parser):
+        parser.add_argument('--command', default=None, help='Management command to load after django.setup() (default: none)')
+        parser.add_argument('--top', type=int, default=20, help='Number of modules to list by cumulative import time')
+        parser.add_argument(
+            '--budget', type=float, default=None,
+            help='Fail when total import time exceeds this many ms (default: STARTUP_IMPORT_BUDGET_MS)',
+        )
+
+    def handle(self, *args, **kwargs):
+        budget = kwargs['budget'] if kwargs.get('budget') is not None else settings.STARTUP_IMPORT_BUDGET_MS
+        try:
+            modules = profile_imports(kwargs.get('command'))
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error profiling startup: {e}"))
+            return
+
+        top = sorted(modules, key=lambda row: row[2], reverse=True)[:kwargs['top']]
+        for module, own, cumulative, depth in top:
+            self.stdout.write(f"{cumulative / 1000:10.1f} ms  {own / 1000:8.1f} ms  {module}")
+
+        total = total_import_ms(modules)
+        self.stdout.write(f"{len(modules)} modules imported in {total:.1f} ms (budget {budget:.0f} ms)")
+        heavy = heavy_imports(modules)
+        if heavy:
+            self.stdout.write(self.style.WARNING(f"Heavy modules loaded: {', '.join(heavy)}"))
+        if total > budget:
+            raise CommandError(f"Startup import time {total:.1f} ms exceeds budget of {budget:.0f} ms")
+        self.stdout.write(self.style.SUCCESS("Startup import time within budget"))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from properties.stats import rebuild_location_stats
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-location listing count, average price and average review score table'
+
+    def handle(self, *args, **kwargs):
+        try:
+            rows = rebuild_location_stats()
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error rebuilding location stats: {e}"))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Location stats rebuilt for {rows} locations"))
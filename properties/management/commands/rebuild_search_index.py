@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from properties.search import rebuild_search_index
+
+class Command(BaseCommand):
+    help = 'Backfill the full-text search vectors of accommodation titles and localized descriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per UPDATE statement')
+        parser.add_argument('--only-missing', action='store_true', help='Only index rows without a search vector')
+
+    def handle(self, *args, **kwargs):
+        try:
+            accommodations, localized = rebuild_search_index(kwargs['batch_size'], kwargs['only_missing'])
+        except Exception as e:
+            self.stderr.write(self.style.ERROR(f"Error rebuilding search index: {e}"))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {accommodations} accommodations and {localized} localized descriptions"
+        ))
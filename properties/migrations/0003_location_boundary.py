@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-19 10:00
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0002_locationstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='boundary',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, null=True, srid=4326),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.3 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_location_boundary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrencyRate',
+            fields=[
+                ('code', models.CharField(max_length=3, primary_key=True, serialize=False)),
+                ('rate', models.DecimalField(decimal_places=6, max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='accommodation',
+            name='usd_rate',
+            field=models.DecimalField(db_index=True, decimal_places=2, max_digits=10),
+        ),
+    ]
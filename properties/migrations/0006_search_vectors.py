@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-19 13:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0005_tombstone_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accommodation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='localizeaccommodation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='accommodation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='accommodation_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='localizeaccommodation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='localized_search_idx'),
+        ),
+    ]
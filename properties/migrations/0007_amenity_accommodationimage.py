@@ -0,0 +1,42 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0006_search_vectors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Amenity',
+            fields=[
+                ('code', models.SlugField(primary_key=True, serialize=False)),
+                ('label', models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                'ordering': ['code'],
+            },
+        ),
+        migrations.AddField(
+            model_name='accommodation',
+            name='amenity_codes',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='accommodations', to='properties.amenity'),
+        ),
+        migrations.CreateModel(
+            name='AccommodationImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('path', models.CharField(max_length=255)),
+                ('accommodation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_manifest', to='properties.accommodation')),
+            ],
+            options={
+                'ordering': ['accommodation', 'position'],
+                'constraints': [models.UniqueConstraint(fields=('accommodation', 'position'), name='unique_image_position')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0007_amenity_accommodationimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='accommodation',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='localizeaccommodation',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
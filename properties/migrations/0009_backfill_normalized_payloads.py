@@ -0,0 +1,56 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:00
+
+from django.db import migrations
+
+from properties.payloads import amenity_codes, image_paths
+
+
+def backfill_normalized_payloads(apps, schema_editor):
+    """
+    Fill the amenity and image manifest tables from the JSON fields of existing
+    accommodations, so the detail page does not lose them until
+    `normalize_payloads` is run by hand.
+    """
+    Accommodation = apps.get_model('properties', 'Accommodation')
+    Amenity = apps.get_model('properties', 'Amenity')
+    AccommodationImage = apps.get_model('properties', 'AccommodationImage')
+    through = Accommodation.amenity_codes.through
+
+    queryset = Accommodation.objects.only('pk', 'images', 'amenities').order_by('pk')
+    last_pk = None
+    while True:
+        batch = list((queryset if last_pk is None else queryset.filter(pk__gt=last_pk))[:1000])
+        if not batch:
+            return
+        codes = {accommodation.pk: amenity_codes(accommodation.amenities) for accommodation in batch}
+        Amenity.objects.bulk_create(
+            [
+                Amenity(code=code, label=code.replace('_', ' ').replace('-', ' ').capitalize())
+                for code in {code for row in codes.values() for code in row}
+            ],
+            ignore_conflicts=True,
+        )
+        through.objects.bulk_create(
+            [through(accommodation_id=pk, amenity_id=code) for pk, row in codes.items() for code in row],
+            ignore_conflicts=True,
+        )
+        AccommodationImage.objects.bulk_create(
+            [
+                AccommodationImage(accommodation_id=accommodation.pk, position=position, path=path)
+                for accommodation in batch
+                for position, path in enumerate(image_paths(accommodation.images))
+            ],
+            ignore_conflicts=True,
+        )
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0008_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_normalized_payloads, migrations.RunPython.noop),
+    ]
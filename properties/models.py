@@ -1,10 +1,20 @@
 from django.contrib.gis.db import models as geomodels
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+# Name of the auth group property owners join at signup. Not translated: one group for all languages.
+PROPERTY_OWNERS_GROUP = 'Property Owners'
 
 class Location(geomodels.Model):
     id = geomodels.CharField(max_length=20, primary_key=True)
     title = geomodels.CharField(max_length=100)
     center = geomodels.PointField()
+    # Optional city/state outline; when present, reverse geocoding uses
+    # point-in-polygon instead of the nearest center.
+    boundary = geomodels.MultiPolygonField(null=True, blank=True)
     parent_id = geomodels.ForeignKey(
         'self', null=True, blank=True, on_delete=geomodels.CASCADE
     )
@@ -13,19 +23,92 @@ class Location(geomodels.Model):
     state_abbr = geomodels.CharField(max_length=3, blank=True)
     city = geomodels.CharField(max_length=30, blank=True)
     created_at = geomodels.DateTimeField(auto_now_add=True)
-    updated_at = geomodels.DateTimeField(auto_now=True)
+    updated_at = geomodels.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.title
 
-class Accommodation(geomodels.Model):
+class PayloadQuerySet(geomodels.QuerySet):
+    def with_payload(self):
+        """
+        Also load the JSON and tsvector columns the default manager defers.
+        """
+        return self.defer(None)
+
+class PayloadDeferringManager(geomodels.Manager.from_queryset(PayloadQuerySet)):
+    """
+    Default manager that leaves the bulky `payload_fields` out of every query;
+    they are fetched on first access, or up front with `.with_payload()`.
+    """
+    def __init__(self, *payload_fields):
+        super().__init__()
+        self.payload_fields = payload_fields
+
+    def get_queryset(self):
+        return super().get_queryset().defer(*self.payload_fields)
+
+class ConcurrentUpdateError(Exception):
+    """
+    A versioned row was changed by someone else since this instance was loaded.
+    """
+
+class VersionedModel(geomodels.Model):
+    """
+    Optimistic concurrency: every update is `UPDATE ... WHERE version = <loaded version>`
+    and bumps the version, so a save based on stale data raises ConcurrentUpdateError
+    instead of silently overwriting the other writer.
+    """
+    version = geomodels.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if self._state.adding:
+            return super().save(*args, update_fields=update_fields, **kwargs)
+        if update_fields is not None:
+            update_fields = {*update_fields, 'version'}
+        self._expected_version = self.version
+        self.version += 1
+        try:
+            super().save(*args, update_fields=update_fields, **kwargs)
+        except BaseException:
+            self.version = self._expected_version
+            raise
+        finally:
+            del self._expected_version
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update, *args, **kwargs):
+        expected = getattr(self, '_expected_version', None)
+        if expected is None:
+            return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update, *args, **kwargs)
+        updated = super()._do_update(
+            base_qs.filter(version=expected), using, pk_val, values, update_fields, forced_update, *args, **kwargs
+        )
+        if not updated and base_qs.filter(pk=pk_val).exists():
+            raise ConcurrentUpdateError(
+                f"{self._meta.verbose_name} {pk_val} was changed since version {expected} was loaded"
+            )
+        return updated
+
+class Amenity(geomodels.Model):
+    code = geomodels.SlugField(max_length=50, primary_key=True)
+    label = geomodels.CharField(max_length=100, blank=True)
+
+    class Meta:
+        ordering = ['code']
+
+    def __str__(self):
+        return self.label or self.code
+
+class Accommodation(VersionedModel):
     id = geomodels.CharField(max_length=20, primary_key=True)
     feed = geomodels.PositiveSmallIntegerField(default=0)
     title = geomodels.CharField(max_length=100)
     country_code = geomodels.CharField(max_length=2)
     bedroom_count = geomodels.PositiveIntegerField()
     review_score = geomodels.DecimalField(max_digits=3, decimal_places=1, default=0)
-    usd_rate = geomodels.DecimalField(max_digits=10, decimal_places=2)
+    usd_rate = geomodels.DecimalField(max_digits=10, decimal_places=2, db_index=True)
     center = geomodels.PointField()
     images = geomodels.JSONField()
     location = geomodels.ForeignKey(Location, on_delete=geomodels.CASCADE)
@@ -35,17 +118,108 @@ class Accommodation(geomodels.Model):
     )
     published = geomodels.BooleanField(default=False)
     created_at = geomodels.DateTimeField(auto_now_add=True)
-    updated_at = geomodels.DateTimeField(auto_now=True)
+    updated_at = geomodels.DateTimeField(auto_now=True, db_index=True)
+    # tsvector of the title, maintained by signals.py; see properties/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Normalized copy of `amenities`, kept in sync by signals.py; see properties/payloads.py
+    amenity_codes = geomodels.ManyToManyField(Amenity, blank=True, editable=False, related_name='accommodations')
+
+    objects = PayloadDeferringManager('images', 'amenities', 'search_vector')
+
+    class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='accommodation_search_idx')]
 
     def __str__(self):
         return self.title
 
-class LocalizeAccommodation(geomodels.Model):
+class LocalizeAccommodation(VersionedModel):
     id = geomodels.AutoField(primary_key=True)
     property = geomodels.ForeignKey(Accommodation, on_delete=geomodels.CASCADE)
     language = geomodels.CharField(max_length=2)
     description = geomodels.TextField()
     policy = geomodels.JSONField()
+    # tsvector of the description, stemmed with the config for `language`
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = PayloadDeferringManager('policy', 'search_vector')
+
+    class Meta:
+        indexes = [GinIndex(fields=['search_vector'], name='localized_search_idx')]
 
     def __str__(self):
         return f"{self.property.title} - {self.language}"
+
+class AccommodationImage(geomodels.Model):
+    """
+    One row per entry of `Accommodation.images`, in order; see properties/payloads.py.
+    """
+    accommodation = geomodels.ForeignKey(
+        Accommodation, on_delete=geomodels.CASCADE, related_name='image_manifest'
+    )
+    position = geomodels.PositiveSmallIntegerField()
+    path = geomodels.CharField(max_length=255)
+
+    class Meta:
+        ordering = ['accommodation', 'position']
+        constraints = [
+            geomodels.UniqueConstraint(fields=['accommodation', 'position'], name='unique_image_position'),
+        ]
+
+    @property
+    def url(self):
+        return default_storage.url(self.path)
+
+    def __str__(self):
+        return self.path
+
+class LocationStats(geomodels.Model):
+    """
+    Rollup of published accommodations for a location and all of its descendants.
+    Kept current by the signals in signals.py; rebuild with `rebuild_location_stats`.
+    """
+    location = geomodels.OneToOneField(
+        Location, primary_key=True, on_delete=geomodels.CASCADE, related_name='stats'
+    )
+    listing_count = geomodels.PositiveIntegerField(default=0)
+    price_total = geomodels.DecimalField(max_digits=16, decimal_places=2, default=0)
+    review_total = geomodels.DecimalField(max_digits=14, decimal_places=1, default=0)
+    updated_at = geomodels.DateTimeField(auto_now=True)
+
+    @property
+    def average_price(self):
+        if not self.listing_count:
+            return None
+        return round(self.price_total / self.listing_count, 2)
+
+    @property
+    def average_review_score(self):
+        if not self.listing_count:
+            return None
+        return round(self.review_total / self.listing_count, 1)
+
+    def __str__(self):
+        return f"{self.location_id}: {self.listing_count} listings"
+
+class Tombstone(geomodels.Model):
+    """
+    Record of a deleted Location or Accommodation, so the change feed can report deletes
+    (including cascaded ones) alongside rows changed since a cursor.
+    """
+    id = geomodels.BigAutoField(primary_key=True)
+    model = geomodels.CharField(max_length=30)
+    object_id = geomodels.CharField(max_length=20)
+    deleted_at = geomodels.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted"
+
+class CurrencyRate(geomodels.Model):
+    """
+    Units of `code` per one US dollar, loaded from CURRENCY_RATES_FILE by `load_currency_rates`.
+    """
+    code = geomodels.CharField(max_length=3, primary_key=True)
+    rate = geomodels.DecimalField(max_digits=18, decimal_places=6)
+    updated_at = geomodels.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.code} {self.rate}"
@@ -0,0 +1,68 @@
+# properties/parallel.py
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections
+
+
+def _init_worker():
+    # Under the spawn start method the child starts from a bare interpreter.
+    # Each worker opens its own database connection on first query.
+    django.setup()
+
+
+def run_sharded(func, tasks, workers=1, priority=None):
+    """
+    Call `func(task, shard_path)` for every task and return the shard paths in
+    the order of `tasks`, whatever order the workers finished in.
+
+    With workers > 1 the calls run in a process pool, scheduled by descending
+    `priority(task)` when given (e.g. subtree size, so big shards start first).
+    `func` must be a module-level function. The caller owns the shard files;
+    `merge_shards` concatenates and removes them.
+    """
+    tasks = list(tasks)
+    shard_dir = tempfile.mkdtemp(prefix='shards-')
+    shard_paths = [os.path.join(shard_dir, f"{index:06d}.part") for index in range(len(tasks))]
+    schedule = list(range(len(tasks)))
+    if priority is not None:
+        schedule.sort(key=lambda index: priority(tasks[index]), reverse=True)
+
+    try:
+        if workers <= 1:
+            for index in schedule:
+                func(tasks[index], shard_paths[index])
+            return shard_paths
+
+        # Children must not share the parent's database sockets; each opens its own.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(func, tasks[index], shard_paths[index]) for index in schedule]
+            for future in futures:
+                future.result()
+        return shard_paths
+    except BaseException:
+        remove_shards(shard_paths)
+        raise
+
+
+def remove_shards(shard_paths):
+    if shard_paths:
+        shutil.rmtree(os.path.dirname(shard_paths[0]), ignore_errors=True)
+
+
+def merge_shards(shard_paths, output, header=None):
+    """
+    Concatenate shard files into the open binary file `output`, in order,
+    then remove them. `header` (bytes) is written once before the shards.
+    """
+    if header:
+        output.write(header)
+    for path in shard_paths:
+        with open(path, 'rb') as shard:
+            shutil.copyfileobj(shard, output)
+    remove_shards(shard_paths)
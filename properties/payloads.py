@@ -0,0 +1,84 @@
+# properties/payloads.py
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Accommodation, AccommodationImage, Amenity
+
+
+def amenity_codes(amenities):
+    """
+    Normalized codes for an `amenities` value: the enabled keys of a dict
+    ({"wifi": true}) or the items of a list (["wifi"]).
+    """
+    if isinstance(amenities, dict):
+        names = [name for name, enabled in amenities.items() if enabled]
+    elif isinstance(amenities, (list, tuple)):
+        names = amenities
+    else:
+        names = []
+    codes = []
+    for name in names:
+        code = slugify(str(name))[:50]
+        if code and code not in codes:
+            codes.append(code)
+    return codes
+
+
+def image_paths(images):
+    if isinstance(images, (list, tuple)):
+        return [str(path) for path in images if path]
+    return []
+
+
+def sync_payloads(accommodations):
+    """
+    Rewrite the amenity links and image manifest of the given accommodations
+    (instances with `images` and `amenities` loaded) from their JSON fields.
+    """
+    accommodations = list(accommodations)
+    if not accommodations:
+        return
+    codes = {accommodation.pk: amenity_codes(accommodation.amenities) for accommodation in accommodations}
+    all_codes = {code for row in codes.values() for code in row}
+    through = Accommodation.amenity_codes.through
+    pks = [accommodation.pk for accommodation in accommodations]
+
+    with transaction.atomic():
+        Amenity.objects.bulk_create(
+            [Amenity(code=code, label=code.replace('_', ' ').replace('-', ' ').capitalize()) for code in all_codes],
+            ignore_conflicts=True,
+        )
+        through.objects.filter(accommodation_id__in=pks).delete()
+        through.objects.bulk_create([
+            through(accommodation_id=pk, amenity_id=code)
+            for pk, row in codes.items() for code in row
+        ])
+        AccommodationImage.objects.filter(accommodation_id__in=pks).delete()
+        AccommodationImage.objects.bulk_create([
+            AccommodationImage(accommodation_id=accommodation.pk, position=position, path=path)
+            for accommodation in accommodations
+            for position, path in enumerate(image_paths(accommodation.images))
+        ])
+
+
+def normalize_payloads(batch_size=1000):
+    """
+    Backfill the normalized tables for every accommodation in primary-key batches,
+    bumping updated_at so the detail page stops serving cached fragments.
+    Returns the number of accommodations processed.
+    """
+    queryset = Accommodation.objects.with_payload().only('pk', 'images', 'amenities').order_by('pk')
+    last_pk = None
+    total = 0
+    while True:
+        batch = list((queryset if last_pk is None else queryset.filter(pk__gt=last_pk))[:batch_size])
+        if not batch:
+            return total
+        with transaction.atomic():
+            sync_payloads(batch)
+            # Moves the cached localized fragments of these listings to new keys.
+            Accommodation._base_manager.filter(pk__in=[row.pk for row in batch]).update(updated_at=timezone.now())
+        total += len(batch)
+        last_pk = batch[-1].pk
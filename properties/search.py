@@ -0,0 +1,146 @@
+# properties/search.py
+
+from django.contrib.gis.measure import D
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import Case, Exists, F, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .currency import annotate_price, convert, filter_price_range
+from .models import Accommodation, LocalizeAccommodation, LocationStats
+
+# Postgres text search configurations for the LocalizeAccommodation languages.
+SEARCH_CONFIGS = {
+    'da': 'danish',
+    'de': 'german',
+    'en': 'english',
+    'es': 'spanish',
+    'fi': 'finnish',
+    'fr': 'french',
+    'hu': 'hungarian',
+    'it': 'italian',
+    'nl': 'dutch',
+    'no': 'norwegian',
+    'pt': 'portuguese',
+    'ro': 'romanian',
+    'ru': 'russian',
+    'sv': 'swedish',
+    'tr': 'turkish',
+}
+DEFAULT_CONFIG = 'simple'
+# Titles mix languages and proper names, so they are indexed without stemming.
+TITLE_CONFIG = 'simple'
+
+
+def language_code(language):
+    return (language or '').split('-')[0].lower()
+
+
+def search_config(language):
+    return SEARCH_CONFIGS.get(language_code(language), DEFAULT_CONFIG)
+
+
+def localized_config():
+    """
+    Per-row config expression, so one UPDATE can index rows of every language.
+    """
+    return Case(
+        *(When(language=code, then=Value(config)) for code, config in SEARCH_CONFIGS.items()),
+        default=Value(DEFAULT_CONFIG),
+    )
+
+
+def localized_vector():
+    return SearchVector('description', config=localized_config())
+
+
+def title_vector():
+    return SearchVector('title', config=TITLE_CONFIG)
+
+
+def update_localized_vector(pk):
+    LocalizeAccommodation.objects.filter(pk=pk).update(search_vector=localized_vector())
+
+
+def update_title_vector(pk):
+    Accommodation._base_manager.filter(pk=pk).update(search_vector=title_vector())
+
+
+def _backfill(queryset, vector, batch_size, only_missing):
+    if only_missing:
+        queryset = queryset.filter(search_vector__isnull=True)
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    total = 0
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        pks = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return total
+        total += queryset.model._base_manager.filter(pk__in=pks).update(search_vector=vector)
+        last_pk = pks[-1]
+
+
+def rebuild_search_index(batch_size=1000, only_missing=False):
+    """
+    Fill the search vectors in primary-key batches, one UPDATE per batch.
+    Returns (accommodations, localized descriptions) updated.
+    """
+    return (
+        _backfill(Accommodation._base_manager.all(), title_vector(), batch_size, only_missing),
+        _backfill(LocalizeAccommodation.objects.all(), localized_vector(), batch_size, only_missing),
+    )
+
+
+def search_accommodations(
+    text, language='en', queryset=None, currency='USD',
+    min_price=None, max_price=None, near=None, radius_km=None,
+):
+    """
+    Published accommodations whose title or description in `language` matches `text`,
+    ranked by relevance and annotated with `rank` and `price` (in `currency`).
+    `near` (a Point) with `radius_km` and the price bounds narrow the results.
+    """
+    code = language_code(language)
+    description_query = SearchQuery(text, config=search_config(code), search_type='websearch')
+    title_query = SearchQuery(text, config=TITLE_CONFIG, search_type='websearch')
+
+    descriptions = LocalizeAccommodation.objects.filter(
+        property=OuterRef('pk'), language=code, search_vector=description_query
+    )
+    description_rank = Subquery(
+        descriptions.annotate(rank=SearchRank(F('search_vector'), description_query))
+        .order_by('-rank').values('rank')[:1],
+        output_field=FloatField(),
+    )
+
+    queryset = (queryset if queryset is not None else Accommodation.objects.all()).filter(published=True)
+    queryset = queryset.filter(Q(search_vector=title_query) | Exists(descriptions))
+    queryset = filter_price_range(queryset, currency, min_price, max_price)
+    if near is not None and radius_km is not None:
+        queryset = queryset.filter(center__distance_lte=(near, D(km=radius_km)))
+    queryset = annotate_price(queryset, currency).annotate(
+        rank=Coalesce(SearchRank(F('search_vector'), title_query), Value(0.0))
+        + Coalesce(description_rank, Value(0.0))
+    )
+    return queryset.order_by('-rank', 'pk')
+
+
+def location_summaries(location_ids, currency='USD'):
+    """
+    Listing count, average price (in `currency`) and average review score for each
+    location, read from the LocationStats rollup in one query instead of
+    aggregating Accommodation per request.
+    """
+    rows = (
+        LocationStats.objects.filter(location_id__in=set(location_ids))
+        .select_related('location').only('location__title', 'listing_count', 'price_total', 'review_total')
+    )
+    return {
+        stats.location_id: {
+            'title': stats.location.title,
+            'listings': stats.listing_count,
+            'average_price': str(convert(stats.average_price, currency)) if stats.listing_count else None,
+            'average_review_score': float(stats.average_review_score) if stats.listing_count else None,
+        }
+        for stats in rows
+    }
@@ -1,17 +1,26 @@
 # signals.py
 
-from django.db.models.signals import post_migrate
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
 from django.dispatch import receiver
+from django.utils import timezone
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
-from .models import Accommodation
+from .models import PROPERTY_OWNERS_GROUP, Accommodation, LocalizeAccommodation, Location, Tombstone
+from .stats import move_contribution
+from .search import update_localized_vector, update_title_vector
+from .payloads import sync_payloads
+
+STATS_FIELDS = ('location_id', 'usd_rate', 'review_score', 'published')
+PROPERTY_OWNERS_GROUP_CACHE_KEY = 'auth:property-owners-group-id'
+PROPERTY_OWNERS_GROUP_CACHE_TIMEOUT = 60 * 5
 
 @receiver(post_migrate)
 def assign_property_owner_permissions(sender, **kwargs):
     """
     Automatically create the 'Property Owners' group and assign permissions to it.
     """
-    group, created = Group.objects.get_or_create(name='Property Owners')
+    group, created = Group.objects.get_or_create(name=PROPERTY_OWNERS_GROUP)
     # Get the Accommodation model content type
     accommodation_content_type = ContentType.objects.get_for_model(Accommodation)
 
@@ -19,3 +28,92 @@ def assign_property_owner_permissions(sender, **kwargs):
     permissions = Permission.objects.filter(content_type=accommodation_content_type)
     for permission in permissions:
         group.permissions.add(permission)
+
+
+@receiver(pre_save, sender=Accommodation)
+def remember_stats_values(sender, instance, raw=False, **kwargs):
+    """
+    Keep the stored values of an accommodation so post_save can move its
+    contribution in the location rollup.
+    """
+    if raw:
+        return
+    instance._stats_previous = (
+        Accommodation._base_manager.filter(pk=instance.pk).values(*STATS_FIELDS).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Accommodation)
+def update_location_stats(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_stats_previous', None)
+    current = {field: getattr(instance, field) for field in STATS_FIELDS}
+    if previous and update_fields is not None:
+        # Fields left out of update_fields were not written, so keep their stored values.
+        written = {sender._meta.get_field(name).attname for name in update_fields}
+        current = {
+            field: value if field in written else previous[field]
+            for field, value in current.items()
+        }
+    move_contribution(previous, current)
+
+
+@receiver(post_delete, sender=Accommodation)
+def remove_from_location_stats(sender, instance, **kwargs):
+    move_contribution({field: getattr(instance, field) for field in STATS_FIELDS}, None)
+
+
+@receiver(post_save, sender=LocalizeAccommodation)
+@receiver(post_delete, sender=LocalizeAccommodation)
+def touch_localized_parent(sender, instance, raw=False, **kwargs):
+    """
+    The cached localized block of accommodation_detail.html is keyed on the parent's
+    version and updated_at. Bumping updated_at moves every process (and every
+    language, since a missing translation falls back to English) to a fresh key.
+    """
+    if raw:
+        return
+    Accommodation._base_manager.filter(pk=instance.property_id).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=Accommodation)
+def record_tombstone(sender, instance, **kwargs):
+    """
+    Leave a tombstone for the change feed. Connecting this receiver also keeps
+    the delete collector from fast-deleting cascaded rows without signals.
+    """
+    Tombstone.objects.create(model=sender._meta.model_name, object_id=instance.pk)
+
+
+@receiver(post_save, sender=Accommodation)
+def index_accommodation_title(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'title' in update_fields:
+        update_title_vector(instance.pk)
+
+
+@receiver(post_save, sender=LocalizeAccommodation)
+def index_localized_description(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'description', 'language'} & set(update_fields):
+        update_localized_vector(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def forget_property_owner_group(sender, instance, **kwargs):
+    cache.delete(PROPERTY_OWNERS_GROUP_CACHE_KEY)
+
+
+@receiver(post_save, sender=Accommodation)
+def sync_normalized_payloads(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Mirror `images` and `amenities` into the image manifest and amenity tables.
+    Deferred fields were not written by this save, so there is nothing to mirror.
+    """
+    payload = {'images', 'amenities'}
+    if raw or payload & instance.get_deferred_fields():
+        return
+    if update_fields is None or payload & set(update_fields):
+        sync_payloads([instance])
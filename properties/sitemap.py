@@ -0,0 +1,64 @@
+# properties/sitemap.py
+
+import json
+
+from .models import Location, LocationStats
+
+
+def slugify_title(title):
+    return title.lower().replace(' ', '-')
+
+
+def stats_fields(stats):
+    """
+    Sitemap keys for a LocationStats row (or None when the location has no listings).
+    """
+    listed = stats is not None and stats.listing_count
+    return {
+        'listings': stats.listing_count if stats else 0,
+        'average_price': float(stats.average_price) if listed else None,
+        'average_review_score': float(stats.average_review_score) if listed else None,
+    }
+
+
+def build_country_entry(country, with_stats=False):
+    """
+    Sitemap entry for a country and its whole subtree, loaded one tree level per
+    query. Children are ordered by title; only the country always has 'locations'.
+    """
+    slug = slugify_title(country.title)
+    entry = {country.title: slug}
+    entries = {country.pk: entry}
+    paths = {country.pk: slug}
+    children = {}
+    frontier = [country.pk]
+    while frontier:
+        level = Location.objects.filter(parent_id__in=frontier).order_by('parent_id', 'title')
+        frontier = []
+        for location in level.only('pk', 'title', 'parent_id'):
+            path = f"{paths[location.parent_id_id]}/{slugify_title(location.title)}"
+            paths[location.pk] = path
+            entries[location.pk] = {location.title: path}
+            children.setdefault(location.parent_id_id, []).append(location.pk)
+            frontier.append(location.pk)
+
+    if with_stats:
+        stats = LocationStats.objects.in_bulk(list(entries))
+        for pk, location_entry in entries.items():
+            location_entry.update(stats_fields(stats.get(pk)))
+
+    for pk, location_entry in entries.items():
+        if pk in children:
+            location_entry['locations'] = [entries[child] for child in children[pk]]
+    entry.setdefault('locations', [])
+    return entry
+
+
+def write_country_shard(task, shard_path):
+    """
+    Worker for `run_sharded`: write one country's sitemap entry as JSON to its shard.
+    """
+    country_id, with_stats = task
+    country = Location.objects.only('pk', 'title').get(pk=country_id)
+    with open(shard_path, mode='w', encoding='utf-8') as shard:
+        json.dump(build_country_entry(country, with_stats), shard, ensure_ascii=False)
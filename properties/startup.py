@@ -0,0 +1,73 @@
+# properties/startup.py
+
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.checks import Tags
+
+# Modules a non-admin command should not pay for at startup. The top-level
+# import_export, leaflet and django.contrib.admin packages are installed apps
+# and always load with django.setup(); their admin, form and resource modules
+# (and tablib behind them) are what only the admin site needs.
+HEAVY_PACKAGES = (
+    'import_export.admin', 'import_export.resources', 'import_export.forms', 'tablib',
+    'leaflet.admin', 'leaflet.forms', 'properties.admin', 'properties.admin_forms',
+)
+
+# Every system check except the URL and admin checks, which import ROOT_URLCONF or
+# autodiscover the admin modules. For commands that never serve a request.
+CHECKS_WITHOUT_URLCONF = [
+    value for name, value in vars(Tags).items()
+    if not name.startswith('_') and value not in (Tags.urls, Tags.admin)
+]
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+STARTUP_CODE = """
+import django
+django.setup()
+from django.core.management import get_commands, load_command_class
+name = {command!r}
+if name:
+    load_command_class(get_commands()[name], name)
+"""
+
+
+def profile_imports(command=None):
+    """
+    Start a fresh interpreter with `-X importtime`, set up Django and load the
+    given management command. Returns a list of (module, self_us, cumulative_us, depth)
+    in import order.
+    """
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'inventoryManagement.settings')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE.format(command=command or '')],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=False,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'startup failed')
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            modules.append((module, int(own), int(cumulative), len(indent) // 2))
+    return modules
+
+
+def total_import_ms(modules):
+    return sum(own for module, own, cumulative, depth in modules) / 1000
+
+
+def heavy_imports(modules):
+    """
+    Modules from HEAVY_PACKAGES that were imported.
+    """
+    return sorted({
+        module for module, own, cumulative, depth in modules
+        if any(module == package or module.startswith(package + '.') for package in HEAVY_PACKAGES)
+    })
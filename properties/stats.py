@@ -0,0 +1,148 @@
+# properties/stats.py
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import Accommodation, Location, LocationStats
+
+
+def ancestor_ids(location_id):
+    """
+    Return the ids of a location and every location above it, nearest first.
+    """
+    ids = []
+    seen = set()
+    while location_id and location_id not in seen:
+        ids.append(location_id)
+        seen.add(location_id)
+        location_id = (
+            Location.objects.filter(pk=location_id)
+            .values_list('parent_id', flat=True)
+            .first()
+        )
+    return ids
+
+
+def contribution(values):
+    """
+    What a single accommodation row adds to the rollup of its location tree.
+    `values` is a dict with location_id, usd_rate, review_score and published.
+    """
+    if not values or not values.get('published'):
+        return None
+    return (
+        values['location_id'],
+        Decimal(values['usd_rate'] or 0),
+        Decimal(values['review_score'] or 0),
+    )
+
+
+def apply_delta(location_id, count, price, review):
+    """
+    Add (or with negative numbers, remove) listings to a location and all of its ancestors.
+    """
+    ids = ancestor_ids(location_id)
+    if not ids:
+        return
+    with transaction.atomic():
+        if count > 0:
+            # Removals never create rows: during a cascaded Location delete the
+            # stats rows may already be gone and must not be recreated.
+            LocationStats.objects.bulk_create(
+                [LocationStats(location_id=pk) for pk in ids], ignore_conflicts=True
+            )
+        LocationStats.objects.filter(location_id__in=ids).update(
+            listing_count=F('listing_count') + count,
+            price_total=F('price_total') + price,
+            review_total=F('review_total') + review,
+            updated_at=timezone.now(),
+        )
+
+
+def move_contribution(old, new):
+    """
+    Update the rollup for an accommodation whose values changed from `old` to `new`.
+    Either side may be None (created, deleted, published or unpublished).
+    """
+    old, new = contribution(old), contribution(new)
+    if old == new:
+        return
+    if old:
+        location_id, price, review = old
+        apply_delta(location_id, -1, -price, -review)
+    if new:
+        location_id, price, review = new
+        apply_delta(location_id, 1, price, review)
+
+
+def location_totals(queryset):
+    """
+    {location_id: (count, price, review)} for the published rows of `queryset`,
+    in one aggregate query.
+    """
+    rows = (
+        queryset.filter(published=True).order_by().values('location_id')
+        .annotate(count=Count('pk'), price=Sum('usd_rate'), review=Sum('review_score'))
+    )
+    return {
+        row['location_id']: (row['count'], row['price'] or Decimal(0), row['review'] or Decimal(0))
+        for row in rows
+    }
+
+
+def apply_totals_change(before, after):
+    """
+    Move the rollup from `before` to `after` (both from `location_totals`), so a bulk
+    UPDATE costs one delta per affected location instead of a full rebuild.
+    """
+    for location_id in before.keys() | after.keys():
+        old = before.get(location_id, (0, 0, 0))
+        new = after.get(location_id, (0, 0, 0))
+        delta = [n - o for n, o in zip(new, old)]
+        if any(delta):
+            apply_delta(location_id, *delta)
+
+
+def rebuild_location_stats():
+    """
+    Recompute the whole rollup table from Accommodation in one aggregate query
+    and a walk over the location tree. Returns the number of rows written.
+    """
+    direct = (
+        Accommodation.objects.filter(published=True)
+        .values('location_id')
+        .annotate(count=Count('pk'), price=Sum('usd_rate'), review=Sum('review_score'))
+    )
+    parents = dict(Location.objects.values_list('id', 'parent_id'))
+
+    totals = defaultdict(lambda: [0, Decimal(0), Decimal(0)])
+    for row in direct:
+        location_id = row['location_id']
+        seen = set()
+        while location_id and location_id not in seen:
+            seen.add(location_id)
+            total = totals[location_id]
+            total[0] += row['count']
+            total[1] += row['price'] or 0
+            total[2] += row['review'] or 0
+            location_id = parents.get(location_id)
+
+    now = timezone.now()
+    rows = [
+        LocationStats(
+            location_id=location_id,
+            listing_count=count,
+            price_total=price,
+            review_total=review,
+            updated_at=now,
+        )
+        for location_id, (count, price, review) in totals.items()
+    ]
+    with transaction.atomic():
+        LocationStats.objects.all().delete()
+        LocationStats.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
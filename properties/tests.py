@@ -1,19 +1,42 @@
+import base64
 import json
+import os
 import tablib
+import tempfile
+from importlib import import_module
+from decimal import Decimal
 from io import StringIO
 from unittest import mock
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.checks import check_admin_app
+from django.contrib.auth.hashers import check_password, make_password
 from django.contrib.auth.models import Group, Permission, User
 from django.contrib.contenttypes.models import ContentType
-from django.contrib.gis.geos import Point
-from django.core.management import call_command
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core import checks
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management import CommandError, call_command
 from django.db.utils import IntegrityError
 from django.template import TemplateDoesNotExist
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client, override_settings
 from django.urls import reverse
+from django.utils import timezone
 
-from properties.models import Location, Accommodation, LocalizeAccommodation
+from properties.models import (
+    Location, Accommodation, LocalizeAccommodation, LocationStats, Tombstone, AccommodationImage, ConcurrentUpdateError,
+    CurrencyRate,
+)
 from properties.forms import SignUpForm, LocationForm, AccommodationAdminForm, LocationResource
-from properties.signals import assign_property_owner_permissions
+from properties.signals import PROPERTY_OWNERS_GROUP_CACHE_KEY, assign_property_owner_permissions
+from properties.geocoding import locate
+from properties.currency import RATES_VERSION_KEY, annotate_price, filter_price_range, format_price, get_rates
+from properties.search import search_accommodations
+from properties.views import get_localized
+from properties.apps import check_discovered_admin_app
+from properties.startup import CHECKS_WITHOUT_URLCONF, heavy_imports, profile_imports, total_import_ms
 
 
 class ModelTests(TestCase):
@@ -322,3 +345,617 @@ class AdminInterfaceTests(TestCase):
         }
         response = self.client.post(url, data, follow=True)
         self.assertIn(response.status_code, [200, 302])
+
+
+class LocationStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', password='ownerpass')
+        self.country = Location.objects.create(
+            id='US', title='United States', center=Point(-98.583333, 39.833333),
+            location_type='country', country_code='US'
+        )
+        self.state = Location.objects.create(
+            id='CA', title='California', center=Point(-119.4179, 36.7783),
+            parent_id=self.country, location_type='state', country_code='US', state_abbr='CA'
+        )
+        self.city = Location.objects.create(
+            id='LA', title='Los Angeles', center=Point(-118.2437, 34.0522),
+            parent_id=self.state, location_type='city', country_code='US', city='Los Angeles'
+        )
+
+    def create_accommodation(self, pk, usd_rate, review_score, published=True):
+        return Accommodation.objects.create(
+            id=pk, title=f'Stay {pk}', country_code='US', bedroom_count=1,
+            review_score=review_score, usd_rate=usd_rate, center=Point(-118.2437, 34.0522),
+            images=[], location=self.city, amenities={}, user=self.user, published=published
+        )
+
+    def test_publish_edit_and_delete_update_every_ancestor(self):
+        first = self.create_accommodation('ACC1', 100, 4.0)
+        self.create_accommodation('ACC2', 200, 5.0)
+        self.create_accommodation('ACC3', 900, 1.0, published=False)
+        for location in (self.city, self.state, self.country):
+            stats = LocationStats.objects.get(location=location)
+            self.assertEqual(stats.listing_count, 2)
+            self.assertEqual(stats.average_price, 150)
+            self.assertEqual(stats.average_review_score, 4.5)
+
+        first.usd_rate = 300
+        first.save()
+        self.assertEqual(LocationStats.objects.get(location=self.country).average_price, 250)
+
+        first.delete()
+        stats = LocationStats.objects.get(location=self.country)
+        self.assertEqual(stats.listing_count, 1)
+        self.assertEqual(stats.average_price, 200)
+
+    def test_rebuild_command_matches_incremental_updates(self):
+        self.create_accommodation('ACC1', 100, 4.0)
+        self.create_accommodation('ACC2', 200, 5.0)
+        incremental = {
+            stats.location_id: (stats.listing_count, stats.price_total, stats.review_total)
+            for stats in LocationStats.objects.all()
+        }
+        out = StringIO()
+        call_command('rebuild_location_stats', stdout=out)
+        rebuilt = {
+            stats.location_id: (stats.listing_count, stats.price_total, stats.review_total)
+            for stats in LocationStats.objects.all()
+        }
+        self.assertEqual(incremental, rebuilt)
+        self.assertIn("Location stats rebuilt for 3 locations", out.getvalue())
+
+
+class GeocodingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', password='ownerpass')
+        self.country = Location.objects.create(
+            id='US', title='United States', center=Point(-98.583333, 39.833333),
+            location_type='country', country_code='US'
+        )
+        self.los_angeles = Location.objects.create(
+            id='LA', title='Los Angeles', center=Point(-118.2437, 34.0522),
+            parent_id=self.country, location_type='city', country_code='US', city='Los Angeles'
+        )
+        self.san_diego = Location.objects.create(
+            id='SD', title='San Diego', center=Point(-117.1611, 32.7157),
+            parent_id=self.country, location_type='city', country_code='US', city='San Diego'
+        )
+
+    def test_locate_uses_nearest_city_center(self):
+        self.assertEqual(locate(Point(-118.0, 34.0, srid=4326)), self.los_angeles)
+        self.assertEqual(locate(Point(-117.2, 32.8, srid=4326)), self.san_diego)
+
+    def test_nearest_city_transforms_other_srids(self):
+        point = Point(-118.0, 34.0, srid=4326)
+        point.transform(3857)
+        self.assertEqual(locate(point), self.los_angeles)
+
+    def test_locate_prefers_containing_boundary(self):
+        self.san_diego.boundary = MultiPolygon(Polygon.from_bbox((-119, 33.5, -117.5, 34.5)))
+        self.san_diego.save()
+        self.assertEqual(locate(Point(-118.0, 34.0, srid=4326)), self.san_diego)
+
+    def test_assign_locations_command(self):
+        Accommodation.objects.create(
+            id='ACC1', title='Wrong city', country_code='US', bedroom_count=1,
+            usd_rate=100, center=Point(-117.2, 32.8), images=[], location=self.los_angeles,
+            amenities={}, user=self.user, published=True
+        )
+        out = StringIO()
+        call_command('assign_locations', '--chunk-size', '1', stdout=out)
+        self.assertEqual(Accommodation.objects.get(id='ACC1').location, self.san_diego)
+        self.assertIn("1 accommodations were reassigned", out.getvalue())
+        self.assertEqual(LocationStats.objects.get(location=self.san_diego).listing_count, 1)
+
+
+class CurrencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as file:
+            file.write("code,rate\nUSD,1\nEUR,0.5\n")
+        self.addCleanup(os.remove, path)
+        call_command('load_currency_rates', path, stdout=StringIO())
+
+        user = User.objects.create_user(username='owner', password='ownerpass')
+        country = Location.objects.create(
+            id='US', title='United States', center=Point(-98.583333, 39.833333),
+            location_type='country', country_code='US'
+        )
+        for pk, usd_rate in (('CHEAP', 100), ('MID', 200), ('DEAR', 400)):
+            Accommodation.objects.create(
+                id=pk, title=pk, country_code='US', bedroom_count=1, usd_rate=usd_rate,
+                center=Point(-98.5, 39.8), images=[], location=country, amenities={},
+                user=user, published=True
+            )
+
+    def test_annotate_price_converts_in_database(self):
+        prices = dict(annotate_price(Accommodation.objects.all(), 'EUR').values_list('id', 'price'))
+        self.assertEqual(prices, {'CHEAP': Decimal('50'), 'MID': Decimal('100'), 'DEAR': Decimal('200')})
+
+    def test_filter_price_range_uses_converted_bounds(self):
+        queryset = filter_price_range(Accommodation.objects.order_by('usd_rate'), 'EUR', minimum=60, maximum=200)
+        self.assertEqual(list(queryset.values_list('id', flat=True)), ['MID', 'DEAR'])
+
+    def test_format_price(self):
+        accommodation = Accommodation.objects.get(id='MID')
+        self.assertEqual(format_price(accommodation, 'EUR'), '100.00 EUR')
+        self.assertEqual(format_price(accommodation, 'USD'), '200.00 USD')
+
+    def test_reload_elsewhere_is_seen_once_version_expires(self):
+        self.assertEqual(get_rates()['EUR'], Decimal('0.5'))
+        # Another process reloads the table; this process's cache is untouched.
+        CurrencyRate.objects.filter(code='EUR').update(rate=Decimal('0.25'), updated_at=timezone.now())
+        self.assertEqual(get_rates()['EUR'], Decimal('0.5'))
+        cache.delete(RATES_VERSION_KEY)  # CURRENCY_VERSION_TIMEOUT elapsed
+        self.assertEqual(get_rates()['EUR'], Decimal('0.25'))
+        self.assertEqual(format_price(Accommodation.objects.get(id='MID'), 'EUR'), '50.00 EUR')
+
+
+class TemplateCachingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='owner', password='ownerpass')
+        country = Location.objects.create(
+            id='US', title='United States', center=Point(-98.583333, 39.833333),
+            location_type='country', country_code='US'
+        )
+        self.accommodation = Accommodation.objects.create(
+            id='ACC1', title='Test Accommodation', country_code='US', bedroom_count=1,
+            usd_rate=100, center=Point(-98.5, 39.8), images=[], location=country,
+            amenities={"wifi": True}, user=self.user, published=True
+        )
+        self.localized = LocalizeAccommodation.objects.create(
+            property=self.accommodation, language='en', description='Original description', policy={}
+        )
+        self.url = reverse('accommodation_detail', args=[self.accommodation.id])
+
+    def fragment_key(self):
+        accommodation = Accommodation.objects.get(pk='ACC1')
+        return make_template_fragment_key(
+            'accommodation_localized', ['ACC1', 'en-us', accommodation.version, accommodation.updated_at]
+        )
+
+    def test_localized_fragment_is_cached_and_rekeyed_on_save(self):
+        self.assertContains(self.client.get(self.url), 'Original description')
+        old_key = self.fragment_key()
+        self.assertIn('Original description', cache.get(old_key))
+
+        self.localized.description = 'Updated description'
+        self.localized.save()
+        # No process clears the old entry; the parent's updated_at moves the key.
+        self.assertNotEqual(self.fragment_key(), old_key)
+        self.assertIn('Original description', cache.get(old_key))
+        self.assertContains(self.client.get(self.url), 'Updated description')
+
+    def test_accommodation_save_rekeys_fragment(self):
+        self.client.get(self.url)
+        old_key = self.fragment_key()
+        accommodation = Accommodation.objects.get(pk='ACC1')
+        accommodation.bedroom_count = 2
+        accommodation.save(update_fields=['bedroom_count'])
+        self.assertNotEqual(self.fragment_key(), old_key)
+
+    def test_benchmark_render_command(self):
+        out = StringIO()
+        call_command('benchmark_render', '--iterations', '2', stdout=out)
+        self.assertIn('home', out.getvalue())
+        self.assertIn('accommodation_detail', out.getvalue())
+
+
+@override_settings(CHANGEFEED_SETTLE_SECONDS=0)
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', password='ownerpass')
+        self.country = Location.objects.create(
+            id='US', title='United States', center=Point(-98.583333, 39.833333),
+            location_type='country', country_code='US'
+        )
+        self.state = Location.objects.create(
+            id='CA', title='California', center=Point(-119.4179, 36.7783),
+            parent_id=self.country, location_type='state', country_code='US', state_abbr='CA'
+        )
+        self.accommodation = Accommodation.objects.create(
+            id='ACC1', title='Stay', country_code='US', bedroom_count=1, usd_rate=100,
+            center=Point(-119.4, 36.7), images=[], location=self.state, amenities={},
+            user=self.user, published=True
+        )
+        self.superuser = User.objects.create_superuser(username='admin', password='adminpass', email='admin@example.com')
+
+    def fetch(self, since=None, limit=500):
+        params = {'limit': limit}
+        if since:
+            params['since'] = since
+        response = self.client.get(reverse('changes'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_requires_permission(self):
+        self.client.login(username='owner', password='ownerpass')
+        self.assertEqual(self.client.get(reverse('changes')).status_code, 403)
+
+    def test_batches_resume_from_cursor_in_order(self):
+        self.client.login(username='admin', password='adminpass')
+        first = self.fetch(limit=2)
+        self.assertEqual(len(first['changes']), 2)
+        self.assertTrue(first['has_more'])
+        second = self.fetch(first['next_cursor'], limit=2)
+        seen = [(change['model'], change['id']) for change in first['changes'] + second['changes']]
+        self.assertCountEqual(seen, [('location', 'US'), ('location', 'CA'), ('accommodation', 'ACC1')])
+        self.assertFalse(second['has_more'])
+        self.assertEqual(self.fetch(second['next_cursor'])['changes'], [])
+
+    def test_cascaded_deletes_leave_tombstones(self):
+        self.client.login(username='admin', password='adminpass')
+        cursor = self.fetch()['next_cursor']
+        self.country.delete()
+        self.assertEqual(Tombstone.objects.count(), 3)
+        deletes = self.fetch(cursor)['changes']
+        self.assertCountEqual(
+            [(change['model'], change['id'], change['op']) for change in deletes],
+            [('location', 'US', 'delete'), ('location', 'CA', 'delete'), ('accommodation', 'ACC1', 'delete')],
+        )
+
+    def test_malformed_tombstone_cursor_is_rejected(self):
+        self.client.login(username='admin', password='adminpass')
+        cursor = base64.urlsafe_b64encode(b'2024-01-01T00:00:00+00:00|tombstone|abc').decode()
+        self.assertEqual(self.client.get(reverse('changes'), {'since': cursor}).status_code, 400)
+
+    def test_export_changes_command(self):
+        out, err = StringIO(), StringIO()
+        call_command('export_changes', '--batch-size', '1', stdout=out, stderr=err)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertIn("3 changes exported", err.getvalue())
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='owner', password='ownerpass')
+        country = Location.objects.create(
+            id='US', title='United States', center=Point(-98.583333, 39.833333),
+            location_type='country', country_code='US'
+        )
+        listings = (
+            ('BEACH', 'Beach House', 300, Point(-118.2437, 34.0522), 'Sunny rooms steps from the beach'),
+            ('CABIN', 'Mountain Cabin', 120, Point(-105.2705, 40.0150), 'Quiet cabin with a beach volleyball court'),
+            ('LOFT', 'City Loft', 200, Point(-74.0060, 40.7128), 'Running distance to every museum'),
+        )
+        for pk, title, usd_rate, center, description in listings:
+            accommodation = Accommodation.objects.create(
+                id=pk, title=title, country_code='US', bedroom_count=1, usd_rate=usd_rate,
+                center=center, images=[], location=country, amenities={}, user=user, published=True
+            )
+            LocalizeAccommodation.objects.create(
+                property=accommodation, language='en', description=description, policy={}
+            )
+
+    def test_title_match_ranks_above_description_match(self):
+        results = list(search_accommodations('beach', 'en').values_list('id', flat=True))
+        self.assertEqual(results, ['BEACH', 'CABIN'])
+
+    def test_description_uses_language_stemming(self):
+        results = list(search_accommodations('runs', 'en').values_list('id', flat=True))
+        self.assertEqual(results, ['LOFT'])
+
+    def test_combines_with_price_and_geo_filters(self):
+        self.assertEqual(
+            list(search_accommodations('beach', 'en', max_price=200).values_list('id', flat=True)), ['CABIN']
+        )
+        near_los_angeles = search_accommodations(
+            'beach', 'en', near=Point(-118.25, 34.05, srid=4326), radius_km=50
+        )
+        self.assertEqual(list(near_los_angeles.values_list('id', flat=True)), ['BEACH'])
+
+    def test_rebuild_search_index_backfills(self):
+        Accommodation.objects.update(search_vector=None)
+        LocalizeAccommodation.objects.update(search_vector=None)
+        self.assertEqual(search_accommodations('beach', 'en').count(), 0)
+        out = StringIO()
+        call_command('rebuild_search_index', '--batch-size', '2', stdout=out)
+        self.assertIn("Indexed 3 accommodations and 3 localized descriptions", out.getvalue())
+        self.assertEqual(search_accommodations('beach', 'en').count(), 2)
+
+    def test_search_view(self):
+        response = self.client.get(reverse('search'), {'q': 'beach', 'max_price': '250'})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual([row['id'] for row in body['results']], ['CABIN'])
+        self.assertEqual(body['locations']['US']['listings'], 3)
+        self.assertEqual(body['locations']['US']['average_price'], '206.67')
+
+    def test_search_view_rejects_non_finite_bounds(self):
+        for params in ({'min_price': 'Infinity'}, {'max_price': 'NaN'}, {'lat': 'nan', 'lng': '0', 'radius_km': '5'}):
+            response = self.client.get(reverse('search'), {'q': 'beach', **params})
+            self.assertEqual(response.status_code, 400)
+
+
+class SignupFlowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.superuser = User.objects.create_superuser(username='admin', password='adminpass', email='admin@example.com')
+
+    def test_signup_hashes_password_once(self):
+        signup_data = {'username': 'newowner', 'email': 'newowner@example.com', 'password': 'ownerpassword123'}
+        with (
+            mock.patch('django.contrib.auth.base_user.make_password', wraps=make_password) as hash_password,
+            mock.patch('django.contrib.auth.base_user.check_password', wraps=check_password) as verify_password,
+        ):
+            self.client.post(reverse('signup'), data=signup_data)
+        self.assertEqual(hash_password.call_count, 1)
+        verify_password.assert_not_called()
+        user = User.objects.get(username='newowner')
+        self.assertEqual(self.client.session['_auth_user_id'], str(user.pk))
+        self.assertEqual(list(user.groups.values_list('name', flat=True)), ['Property Owners'])
+
+    def test_signup_reuses_cached_group(self):
+        self.client.post(reverse('signup'), data={'username': 'first', 'email': 'first@example.com', 'password': 'ownerpassword123'})
+        self.client.logout()
+        with mock.patch.object(Group.objects, 'get_or_create') as get_or_create:
+            self.client.post(reverse('signup'), data={'username': 'second', 'email': 'second@example.com', 'password': 'ownerpassword123'})
+        get_or_create.assert_not_called()
+        self.assertEqual(Group.objects.filter(name='Property Owners').count(), 1)
+
+    def test_bulk_approve_action(self):
+        group = Group.objects.get_or_create(name='Property Owners')[0]
+        pending = [User(username=f'pending{i}', is_active=False) for i in range(5)]
+        User.objects.bulk_create(pending)
+        pending = User.objects.filter(username__startswith='pending')
+        for user in pending:
+            user.groups.add(group)
+        User.objects.create_user(username='outsider', password='x', is_active=False)
+
+        self.client.login(username='admin', password='adminpass')
+        response = self.client.post('/admin/auth/user/', {
+            'action': 'approve_property_owners',
+            '_selected_action': [str(pk) for pk in User.objects.values_list('pk', flat=True)],
+        }, follow=True)
+        self.assertContains(response, '5 property owners approved.')
+        self.assertFalse(User.objects.filter(username__startswith='pending', is_active=False).exists())
+        self.assertFalse(User.objects.get(username='outsider').is_active)
+
+
+
+class PropertyOwnerGroupCacheTests(TransactionTestCase):
+    # TransactionTestCase: the deferred foreign key check only fires on a real commit.
+    def test_signup_recovers_from_stale_group_id(self):
+        stale_id = Group.objects.get_or_create(name='Property Owners')[0].pk
+        # Deleted and recreated by another process, whose cache clear never reached this one.
+        Group.objects.filter(pk=stale_id).delete()
+        group = Group.objects.create(name='Property Owners')
+        cache.set(PROPERTY_OWNERS_GROUP_CACHE_KEY, stale_id)
+
+        self.client.post(reverse('signup'), data={
+            'username': 'newowner', 'email': 'newowner@example.com', 'password': 'ownerpassword123',
+        })
+        user = User.objects.get(username='newowner')
+        self.assertEqual(list(user.groups.values_list('pk', flat=True)), [group.pk])
+
+
+class PayloadStorageTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='owner', password='ownerpass')
+        country = Location.objects.create(
+            id='US', title='United States', center=Point(-98.583333, 39.833333),
+            location_type='country', country_code='US'
+        )
+        self.accommodation = Accommodation.objects.create(
+            id='ACC1', title='Stay', country_code='US', bedroom_count=1, usd_rate=100,
+            center=Point(-98.5, 39.8), images=['rooms/a.jpg', 'rooms/b.jpg'], location=country,
+            amenities={'wifi': True, 'air_conditioning': True, 'pool': False}, user=user, published=True
+        )
+        LocalizeAccommodation.objects.create(
+            property=self.accommodation, language='en', description='Nice', policy={'pets': 'no'}
+        )
+
+    def test_default_managers_defer_payload(self):
+        self.assertEqual(
+            Accommodation.objects.get(pk='ACC1').get_deferred_fields(),
+            {'images', 'amenities', 'search_vector'},
+        )
+        self.assertEqual(LocalizeAccommodation.objects.get().get_deferred_fields(), {'policy', 'search_vector'})
+        self.assertEqual(Accommodation.objects.with_payload().get(pk='ACC1').get_deferred_fields(), set())
+        with self.assertNumQueries(1):
+            self.assertEqual(Accommodation.objects.get(pk='ACC1').title, 'Stay')
+
+    def test_payloads_are_normalized_on_save(self):
+        self.assertEqual(
+            list(self.accommodation.amenity_codes.values_list('code', flat=True)), ['air_conditioning', 'wifi']
+        )
+        self.assertEqual(
+            list(AccommodationImage.objects.filter(accommodation=self.accommodation).values_list('path', flat=True)),
+            ['rooms/a.jpg', 'rooms/b.jpg'],
+        )
+        # Saving an instance with deferred payload leaves the normalized rows untouched.
+        accommodation = Accommodation.objects.get(pk='ACC1')
+        accommodation.title = 'Renamed'
+        accommodation.save()
+        self.assertEqual(self.accommodation.image_manifest.count(), 2)
+
+    def test_normalize_and_benchmark_commands(self):
+        AccommodationImage.objects.all().delete()
+        Accommodation.amenity_codes.through.objects.all().delete()
+        out = StringIO()
+        call_command('normalize_payloads', '--batch-size', '1', stdout=out)
+        self.assertIn("Normalized payloads of 1 accommodations", out.getvalue())
+        self.assertEqual(self.accommodation.image_manifest.count(), 2)
+        self.assertEqual(self.accommodation.amenity_codes.count(), 2)
+
+        out = StringIO()
+        call_command('benchmark_list_query', '--iterations', '1', stdout=out)
+        self.assertIn('Accommodation (payload deferred)', out.getvalue())
+
+    def test_normalize_payloads_bumps_updated_at(self):
+        before = Accommodation.objects.get(pk='ACC1').updated_at
+        call_command('normalize_payloads', stdout=StringIO())
+        self.assertGreater(Accommodation.objects.get(pk='ACC1').updated_at, before)
+
+    def test_migration_backfills_normalized_tables(self):
+        backfill = import_module('properties.migrations.0009_backfill_normalized_payloads').backfill_normalized_payloads
+        AccommodationImage.objects.all().delete()
+        Accommodation.amenity_codes.through.objects.all().delete()
+        backfill(django_apps, None)
+        self.assertEqual(self.accommodation.image_manifest.count(), 2)
+        self.assertEqual(self.accommodation.amenity_codes.count(), 2)
+
+    def test_get_localized_loads_policy(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_localized(self.accommodation, 'en').policy, {'pets': 'no'})
+
+
+class ParallelExportTests(TransactionTestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='owner', password='ownerpass')
+        for code, title in (('US', 'United States'), ('CA', 'Canada'), ('MX', 'México')):
+            country = Location.objects.create(
+                id=code, title=title, center=Point(0, 0), location_type='country', country_code=code
+            )
+            for index in range(3):
+                state = Location.objects.create(
+                    id=f'{code}-S{index}', title=f'{title} State {index}', center=Point(0, 0),
+                    parent_id=country, location_type='state', country_code=code
+                )
+                city = Location.objects.create(
+                    id=f'{code}-C{index}', title=f'City {index}', center=Point(0, 0),
+                    parent_id=state, location_type='city', country_code=code
+                )
+                Accommodation.objects.create(
+                    id=f'{code}{index}', title=f'Stay {index}', country_code=code, bedroom_count=1,
+                    usd_rate=100 + index, center=Point(0, 0), images=[], location=city, amenities={},
+                    user=user, published=True
+                )
+
+    def read(self, path):
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def test_sitemap_workers_match_serial_output(self):
+        with tempfile.TemporaryDirectory() as serial, tempfile.TemporaryDirectory() as parallel:
+            call_command('generate_sitemap', '--with-stats', '--output-dir', serial, stdout=StringIO())
+            call_command(
+                'generate_sitemap', '--with-stats', '--output-dir', parallel, '--workers', '2', stdout=StringIO()
+            )
+            serial_output = self.read(os.path.join(serial, 'sitemap.json'))
+            self.assertEqual(serial_output, self.read(os.path.join(parallel, 'sitemap.json')))
+        sitemap = json.loads(serial_output)
+        self.assertEqual([next(iter(entry)) for entry in sitemap], ['Canada', 'México', 'United States'])
+        self.assertEqual(sitemap[0]['listings'], 3)
+
+    def test_export_workers_match_serial_output(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for export_format in ('csv', 'ndjson'):
+                serial = os.path.join(directory, f'serial.{export_format}')
+                parallel = os.path.join(directory, f'parallel.{export_format}')
+                call_command('export_accommodations', '--format', export_format, '--output', serial, stdout=StringIO())
+                call_command(
+                    'export_accommodations', '--format', export_format, '--output', parallel,
+                    '--workers', '3', stdout=StringIO()
+                )
+                self.assertEqual(self.read(serial), self.read(parallel))
+            self.assertEqual(len(self.read(serial).splitlines()), 9)
+
+
+class ConcurrencyTests(TestCase):
+    def setUp(self):
+        self.superuser = User.objects.create_superuser(username='admin', password='adminpass', email='admin@example.com')
+        country = Location.objects.create(
+            id='US', title='United States', center=Point(-98.583333, 39.833333),
+            location_type='country', country_code='US'
+        )
+        for pk, usd_rate, published in (('ACC1', 100, True), ('ACC2', 200, False)):
+            Accommodation.objects.create(
+                id=pk, title=f'Stay {pk}', country_code='US', bedroom_count=1, usd_rate=usd_rate,
+                center=Point(-98.5, 39.8), images=[], location=country, amenities={},
+                user=self.superuser, published=published
+            )
+
+    def test_stale_save_raises_and_keeps_other_edit(self):
+        owner_copy = Accommodation.objects.get(pk='ACC1')
+        feed_copy = Accommodation.objects.get(pk='ACC1')
+        feed_copy.usd_rate = 120
+        feed_copy.save(update_fields=['usd_rate'])
+        self.assertEqual(feed_copy.version, 1)
+
+        owner_copy.title = 'Owner title'
+        with self.assertRaises(ConcurrentUpdateError):
+            owner_copy.save(update_fields=['title'])
+        self.assertEqual(owner_copy.version, 0)
+        stored = Accommodation.objects.get(pk='ACC1')
+        self.assertEqual((stored.title, stored.usd_rate, stored.version), ('Stay ACC1', Decimal('120.00'), 1))
+
+    def test_localized_rows_are_versioned(self):
+        localized = LocalizeAccommodation.objects.create(
+            property_id='ACC1', language='en', description='Nice', policy={}
+        )
+        stale = LocalizeAccommodation.objects.get(pk=localized.pk)
+        localized.description = 'Nicer'
+        localized.save()
+        stale.description = 'Stale'
+        with self.assertRaises(ConcurrentUpdateError):
+            stale.save()
+
+    def test_bulk_price_and_publish_actions(self):
+        self.client.login(username='admin', password='adminpass')
+        url = '/admin/properties/accommodation/'
+        self.client.post(url, {
+            'action': 'change_price', 'price_percent': '10', '_selected_action': ['ACC1', 'ACC2'],
+        })
+        self.client.post(url, {'action': 'publish', '_selected_action': ['ACC1', 'ACC2']})
+        rows = dict(Accommodation.objects.values_list('pk', 'usd_rate'))
+        self.assertEqual(rows, {'ACC1': Decimal('110.00'), 'ACC2': Decimal('220.00')})
+        self.assertEqual(Accommodation.objects.filter(published=True).count(), 2)
+        self.assertEqual(Accommodation.objects.get(pk='ACC2').version, 2)
+        self.assertEqual(LocationStats.objects.get(location_id='US').listing_count, 2)
+
+    def test_bulk_actions_update_rollup_incrementally(self):
+        self.client.login(username='admin', password='adminpass')
+        url = '/admin/properties/accommodation/'
+        self.client.post(url, {
+            'action': 'change_price', 'price_percent': '50', '_selected_action': ['ACC1', 'ACC2'],
+        })
+        self.client.post(url, {'action': 'unpublish', '_selected_action': ['ACC1']})
+        self.client.post(url, {'action': 'publish', '_selected_action': ['ACC2']})
+        stats = LocationStats.objects.get(location_id='US')
+        self.assertEqual((stats.listing_count, stats.price_total), (1, Decimal('300.00')))
+
+    def test_change_price_rejects_overflow(self):
+        self.client.login(username='admin', password='adminpass')
+        Accommodation.objects.filter(pk='ACC1').update(usd_rate=Decimal('90000000'))
+        response = self.client.post('/admin/properties/accommodation/', {
+            'action': 'change_price', 'price_percent': '20', '_selected_action': ['ACC1', 'ACC2'],
+        }, follow=True)
+        self.assertContains(response, 'would exceed the largest price')
+        self.assertEqual(Accommodation.objects.get(pk='ACC2').usd_rate, Decimal('200.00'))
+
+
+class StartupBudgetTests(TestCase):
+    def test_cron_command_skips_admin_stack(self):
+        modules = profile_imports('generate_sitemap')
+        names = {module for module, own, cumulative, depth in modules}
+        self.assertIn('properties.management.commands.generate_sitemap', names)
+        self.assertEqual(heavy_imports(modules), [])
+        self.assertLess(total_import_ms(modules), settings.STARTUP_IMPORT_BUDGET_MS)
+
+    def test_admin_checks_run_on_discovered_registry(self):
+        registered = checks.registry.registry.registered_checks
+        self.assertIn(check_discovered_admin_app, registered)
+        self.assertNotIn(check_admin_app, registered)
+        self.assertEqual(check_discovered_admin_app(None), [])
+        self.assertIn(Accommodation, admin.site._registry)
+        self.assertNotIn(checks.Tags.admin, CHECKS_WITHOUT_URLCONF)
+
+    def test_forms_still_expose_admin_form(self):
+        from properties import admin_forms
+        self.assertIs(LocationForm, admin_forms.LocationForm)
+        self.assertIs(LocationResource, admin_forms.LocationResource)
+
+    def test_profile_startup_command(self):
+        out = StringIO()
+        call_command('profile_startup', '--top', '3', stdout=out)
+        self.assertIn('modules imported in', out.getvalue())
+
+    def test_profile_startup_fails_over_budget(self):
+        with self.assertRaises(CommandError):
+            call_command('profile_startup', '--top', '0', '--budget', '0', stdout=StringIO())
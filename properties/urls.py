@@ -7,4 +7,6 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('signup/', views.signup, name='signup'),
     path('accommodation/<str:accommodation_id>/', views.accommodation_detail, name='accommodation_detail'),
+    path('changes/', views.changes, name='changes'),
+    path('search/', views.search, name='search'),
 ]
@@ -1,16 +1,50 @@
 # properties/views.py
 
+import math
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.decorators import permission_required
+from django.contrib.gis.geos import Point
+from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth.models import Group
-from django.contrib.auth import authenticate, login
-from django.utils.translation import gettext as _
+from django.contrib.auth import login
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.utils.translation import get_language
+from django.utils.functional import SimpleLazyObject
+from django.db.models import Case, IntegerField, Value, When
 from .forms import SignUpForm
-from .models import Accommodation, LocalizeAccommodation
+from .models import PROPERTY_OWNERS_GROUP, Accommodation, LocalizeAccommodation
+from .signals import PROPERTY_OWNERS_GROUP_CACHE_KEY, PROPERTY_OWNERS_GROUP_CACHE_TIMEOUT
+from .currency import format_price, request_currency
+from .changefeed import InvalidCursor, fetch_changes
+from .search import location_summaries, search_accommodations
 
 def home(request):
     return render(request, 'properties/home.html')
 
+def property_owner_group_id():
+    """
+    Id of the 'Property Owners' group. Cached per process; saving or deleting the group
+    clears this process's copy (see signals.py) and the timeout bounds the others.
+    """
+    return cache.get_or_set(
+        PROPERTY_OWNERS_GROUP_CACHE_KEY,
+        lambda: Group.objects.get_or_create(name=PROPERTY_OWNERS_GROUP)[0].pk,
+        PROPERTY_OWNERS_GROUP_CACHE_TIMEOUT,
+    )
+
+def add_to_property_owners(user):
+    try:
+        with transaction.atomic():
+            user.groups.add(property_owner_group_id())
+    except IntegrityError:
+        # The cached id belongs to a group another process deleted; look it up again.
+        cache.delete(PROPERTY_OWNERS_GROUP_CACHE_KEY)
+        user.groups.add(property_owner_group_id())
+
 def signup(request):
     if request.method == 'POST':
         form = SignUpForm(request.POST)
@@ -18,23 +52,101 @@ def signup(request):
             user = form.save(commit=False)
             user.set_password(form.cleaned_data['password'])
             user.save()
-            property_owner_group, created = Group.objects.get_or_create(name=_('Property Owners'))
-            user.groups.add(property_owner_group)
-            user = authenticate(username=form.cleaned_data['username'], password=form.cleaned_data['password'])
-            if user is not None:
-                login(request, user)
+            add_to_property_owners(user)
+            # The password was just hashed; logging the new user in directly avoids
+            # authenticate() hashing it a second time.
+            if user.is_active:
+                login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
             return redirect('home')
     else:
         form = SignUpForm()
     return render(request, 'properties/signup.html', {'form': form})
 
+def get_localized(accommodation, language):
+    """
+    The description in `language`, falling back to English, in a single query.
+    The template also shows `policy`, so only the search vector stays deferred.
+    """
+    return (
+        LocalizeAccommodation.objects.with_payload().defer('search_vector').filter(property=accommodation, language__in=[language, 'en'])
+        .order_by(Case(When(language=language, then=Value(0)), default=Value(1), output_field=IntegerField()))
+        .first()
+    )
+
 def accommodation_detail(request, accommodation_id):
     accommodation = Accommodation.objects.get(id=accommodation_id)
     language = get_language()
-    localized = LocalizeAccommodation.objects.filter(property=accommodation, language=language).first()
-    if not localized:
-        localized = LocalizeAccommodation.objects.filter(property=accommodation, language='en').first()
+    # Lazy so a cached localized fragment skips the query entirely.
+    localized = SimpleLazyObject(lambda: get_localized(accommodation, language))
+    currency = request_currency(request)
     return render(request, 'properties/accommodation_detail.html', {
         'accommodation': accommodation,
         'localized': localized,
+        'currency': currency,
+        'price': format_price(accommodation, currency),
+    })
+
+@permission_required('properties.view_accommodation', raise_exception=True)
+def changes(request):
+    """
+    Incremental sync: Location/Accommodation upserts and deletes after `since`, oldest first.
+    Pass the returned `next_cursor` as `since` on the next call.
+    """
+    try:
+        limit = min(int(request.GET.get('limit', 500)), settings.CHANGEFEED_MAX_BATCH)
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'error': 'limit must be a positive integer'}, status=400)
+    try:
+        batch, next_cursor = fetch_changes(request.GET.get('since'), limit)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({
+        'changes': batch,
+        'next_cursor': next_cursor,
+        'has_more': len(batch) == limit,
+    })
+
+def finite(value, parse=float):
+    """
+    Parse a numeric query parameter, rejecting NaN and infinities.
+    """
+    number = parse(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{value!r} is not a finite number")
+    return number
+
+def search(request):
+    """
+    Ranked full-text search over titles and descriptions in the active language,
+    with optional price range (in the visitor's currency) and radius filters.
+    `locations` summarizes the result locations from the LocationStats rollup.
+    """
+    text = request.GET.get('q', '').strip()
+    if not text:
+        return JsonResponse({'error': 'q is required'}, status=400)
+    currency = request_currency(request)
+    try:
+        min_price = finite(request.GET['min_price'], Decimal) if request.GET.get('min_price') else None
+        max_price = finite(request.GET['max_price'], Decimal) if request.GET.get('max_price') else None
+        near = radius_km = None
+        if request.GET.get('lat') and request.GET.get('lng') and request.GET.get('radius_km'):
+            near = Point(finite(request.GET['lng']), finite(request.GET['lat']), srid=4326)
+            radius_km = finite(request.GET['radius_km'])
+        limit = min(int(request.GET.get('limit', 20)), 100)
+        results = search_accommodations(
+            text, get_language(), currency=currency, min_price=min_price, max_price=max_price,
+            near=near, radius_km=radius_km,
+        ).only('pk', 'title', 'usd_rate', 'location')[:limit]
+        results = [
+            {'id': row.pk, 'title': row.title, 'location': row.location_id, 'price': str(row.price), 'rank': row.rank}
+            for row in results
+        ]
+    except (ValueError, ArithmeticError):
+        return JsonResponse({'error': 'invalid numeric parameter'}, status=400)
+    return JsonResponse({
+        'currency': currency,
+        'results': results,
+        'locations': location_summaries([row['location'] for row in results], currency),
     })